@@ -1,66 +1,69 @@
-import csv
+import argparse
 import sys
+import time
 
-from util import Node, StackFrontier, QueueFrontier
+from graph import load_graph
+from landmarks import load_landmarks
+from lookup import load_name_index
+from service import run_batch, serve
+from util import load_summary
 
-# Maps names to a set of corresponding person_ids
-names = {}
-
-# Maps person_ids to a dictionary of: name, birth, movies (a set of movie_ids)
-people = {}
-
-# Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
-movies = {}
+# Graph of the people and movies loaded by load_data, see graph.py
+graph = None
 
 
 def load_data(directory):
     """
-    Load data from CSV files into memory.
+    Load data from CSV files into memory, or from the snapshot of a
+    previous run.
+
+    Returns the graph, whose `rows_read` counts the CSV rows parsed.
     """
-    # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
-
-    # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
-
-    # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+    global graph
+    graph = load_graph(directory)
+    return graph
 
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
-
-    # Load data from files into memory
-    print("Loading data...")
-    load_data(directory)
-    print("Data loaded.")
+    parser = argparse.ArgumentParser(description="Degrees of separation.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="answer source,target lines from FILE "
+                             "('-' for stdin) as JSON lines")
+    parser.add_argument("--workers", metavar="N", type=int,
+                        help="answer --batch queries in N processes")
+    parser.add_argument("--serve", metavar="PORT", type=int,
+                        help="answer queries as JSON over HTTP on PORT")
+    parser.add_argument("--landmarks", metavar="K", type=int,
+                        help="bound searches with BFS trees from the K "
+                             "people with the most movies")
+    args = parser.parse_args()
+
+    # Keep stdout for answers when running as a service
+    log = sys.stderr if args.batch or args.serve else sys.stdout
+
+    # Load data from files into memory, or from the snapshot of a previous run
+    print("Loading data...", file=log)
+    start = time.perf_counter()
+    graph = load_data(args.directory)
+    seconds = time.perf_counter() - start
+    if args.landmarks:
+        graph.landmarks = load_landmarks(graph, args.directory, args.landmarks)
+    if args.batch or args.serve:
+        graph.name_index = load_name_index(graph, args.directory)
+    print(load_summary(graph.rows_read, seconds), file=log)
+
+    if args.batch == "-":
+        run_batch(graph, sys.stdin, sys.stdout, args.workers)
+        return
+    elif args.batch:
+        with open(args.batch, encoding="utf-8") as f:
+            run_batch(graph, f, sys.stdout, args.workers)
+        return
+    elif args.serve:
+        print(f"Serving on http://127.0.0.1:{args.serve}/", file=log)
+        serve(graph, args.serve)
+        return
 
     source = person_id_for_name(input("Name: "))
     if source is None:
@@ -78,9 +81,9 @@ def main():
         print(f"{degrees} degrees of separation.")
         path = [(None, source)] + path
         for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
+            person1 = graph.person(path[i][1])["name"]
+            person2 = graph.person(path[i + 1][1])["name"]
+            movie = graph.movie(path[i + 1][0])["title"]
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
@@ -90,38 +93,11 @@ def shortest_path(source, target):
     that connect the source to the target.
 
     If no possible path, returns None.
-    """
-
-    start = Node(state=source, parent=None, action=None)
-    explored = set() 
-    frontier = QueueFrontier()
-    frontier.add(start)
-
-    while True:
-        # If frontier is empty, then no solution
-        if frontier.empty():
-            return None
-
-        # Consider one node
-        node = frontier.remove()
 
-        # Check if node is target goal
-        if node.state == target:
-            actions = []
-
-            while node.parent is not None:
-                actions.append(node.action)
-                node = node.parent
-
-            actions.reverse()
-            return actions
-
-        explored.add(node)
-
-        for movie, person in neighbors_for_person(node.state):
-            if not frontier.contains_state(person) and person not in explored:
-                child = Node(state=person, parent=node, action=(movie, person))
-                frontier.add(child)
+    Searches breadth-first from both people at once, expanding the
+    smaller frontier each step, see Graph.search.
+    """
+    return graph.shortest_path(source, target)
 
 
 def person_id_for_name(name):
@@ -129,13 +105,13 @@ def person_id_for_name(name):
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    person_ids = graph.person_ids_for_name(name)
     if len(person_ids) == 0:
         return None
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
         for person_id in person_ids:
-            person = people[person_id]
+            person = graph.person(person_id)
             name = person["name"]
             birth = person["birth"]
             print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
@@ -150,17 +126,5 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
-def neighbors_for_person(person_id):
-    """
-    Returns (movie_id, person_id) pairs for people
-    who starred with a given person.
-    """
-    movie_ids = people[person_id]["movies"]
-    neighbors = set()
-    for movie_id in movie_ids:
-        for person_id in movies[movie_id]["stars"]:
-            neighbors.add((movie_id, person_id))
-    return neighbors
-
 if __name__ == "__main__":
     main()
@@ -0,0 +1,567 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import Sequence
+from sys import intern
+
+from util import join_paths, read_csv
+
+# File name of the binary snapshot written next to the CSV files
+SNAPSHOT = "degrees.snapshot"
+SNAPSHOT_MAGIC = b"DEGREES1"
+
+# CSV files a snapshot is built from, checked to invalidate it
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+# Graph columns stored in a snapshot
+INT_COLUMNS = ("person_offsets", "person_movies",
+               "movie_offsets", "movie_stars", "name_order")
+STRING_COLUMNS = ("person_ids", "names", "births",
+                  "movie_ids", "titles", "years")
+
+
+class Graph():
+    """
+    Compact representation of the degrees dataset.
+
+    People and movies are interned to consecutive integer indexes, in
+    order of their IMDB ids, and the bipartite person-movie graph is
+    stored as compressed sparse rows: the movies of person `p` are
+    `person_movies[person_offsets[p]:person_offsets[p + 1]]`, and the
+    stars of movie `m` are `movie_stars[movie_offsets[m]:movie_offsets[m + 1]]`.
+    """
+
+    def __init__(self, person_ids, names, births, movie_ids, titles, years,
+                 person_offsets, person_movies, movie_offsets, movie_stars,
+                 name_order):
+        # Per-person and per-movie columns, indexed by interned id
+        self.person_ids = person_ids
+        self.names = names
+        self.births = births
+        self.movie_ids = movie_ids
+        self.titles = titles
+        self.years = years
+
+        # Compressed sparse rows of the bipartite graph
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_stars = movie_stars
+
+        # Person indexes sorted by lowercase name
+        self.name_order = name_order
+
+        # Optional landmark distances used to bound searches, see landmarks.py
+        self.landmarks = None
+
+        # Optional index used to suggest people by name, see lookup.py
+        self.name_index = None
+
+        # Number of CSV rows parsed to build the graph, 0 for a snapshot
+        self.rows_read = 0
+
+    @classmethod
+    def from_csv(cls, directory):
+        """
+        Loads a graph from the CSV files in `directory`.
+        """
+        # Load people, ordered by id
+        rows = sorted(read_csv(f"{directory}/people.csv",
+                               "id", "name", "birth"))
+        rows_read = len(rows)
+        person_ids = [row[0] for row in rows]
+        names = [row[1] for row in rows]
+        births = [intern(row[2]) for row in rows]
+
+        # Load movies, ordered by id
+        rows = sorted(read_csv(f"{directory}/movies.csv",
+                               "id", "title", "year"))
+        rows_read += len(rows)
+        movie_ids = [row[0] for row in rows]
+        titles = [row[1] for row in rows]
+        years = [intern(row[2]) for row in rows]
+        del rows
+
+        # Load stars as (person, movie) index pairs, skipping unknown ids
+        person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+        stars = array("q")
+        for person_id, movie_id in read_csv(f"{directory}/stars.csv",
+                                            "person_id", "movie_id"):
+            person = person_index.get(person_id)
+            movie = movie_index.get(movie_id)
+            if person is not None and movie is not None:
+                stars.append(person * len(movie_ids) + movie)
+            rows_read += 1
+        del person_index, movie_index
+
+        graph = cls.build(person_ids, names, births, movie_ids, titles, years,
+                          ((key // len(movie_ids), key % len(movie_ids))
+                           for key in stars))
+        graph.rows_read = rows_read
+        return graph
+
+    @classmethod
+    def build(cls, person_ids, names, births, movie_ids, titles, years, stars):
+        """
+        Builds the sparse rows from a collection of (person, movie) pairs
+        of interned indexes, with `person_ids` and `movie_ids` sorted.
+        """
+        # Encode each pair as one int, so that duplicates drop out and
+        # sorting orders the pairs by person, then by movie
+        keys = sorted({person * len(movie_ids) + movie
+                       for person, movie in stars})
+        people = array("i", (key // len(movie_ids) for key in keys))
+        movies = array("i", (key % len(movie_ids) for key in keys))
+        del keys
+
+        person_offsets, person_movies = compress(len(person_ids),
+                                                 people, movies)
+        movie_offsets, movie_stars = compress(len(movie_ids), movies, people)
+        name_order = array("i", sorted(
+            range(len(person_ids)), key=lambda i: names[i].lower()
+        ))
+        return cls(person_ids, names, births, movie_ids, titles, years,
+                   person_offsets, person_movies, movie_offsets, movie_stars,
+                   name_order)
+
+    @classmethod
+    def load(cls, path, stamp=None):
+        """
+        Memory-maps a snapshot written by `save`.
+
+        Raises ValueError if the file is not a snapshot, or if `stamp`
+        is given and does not match the stamp the snapshot was saved with.
+        """
+        sections = read_snapshot(path, stamp)
+        columns = {}
+        for name in INT_COLUMNS:
+            columns[name] = cast(sections[name], "i")
+        for name in STRING_COLUMNS:
+            columns[name] = StringTable(
+                cast(sections[f"{name}.offsets"], "q"),
+                sections[f"{name}.data"]
+            )
+        return cls(**columns)
+
+    def save(self, path, stamp=None):
+        """
+        Writes the graph to a binary snapshot that `load` can memory-map.
+        """
+        chunks = []
+        for name in INT_COLUMNS:
+            chunks.append((name, array("i", getattr(self, name)).tobytes()))
+        for name in STRING_COLUMNS:
+            offsets, data = pack_strings(getattr(self, name))
+            chunks.append((f"{name}.offsets", offsets.tobytes()))
+            chunks.append((f"{name}.data", data))
+        write_snapshot(path, chunks, stamp)
+
+    def person(self, person_id):
+        """
+        Returns a dictionary of name and birth for an IMDB person id.
+        """
+        i = self.person_index(person_id)
+        return {"name": self.names[i], "birth": self.births[i]}
+
+    def movie(self, movie_id):
+        """
+        Returns a dictionary of title and year for an IMDB movie id.
+        """
+        i = self.movie_index(movie_id)
+        return {"title": self.titles[i], "year": self.years[i]}
+
+    def person_index(self, person_id):
+        """
+        Returns the interned index of an IMDB person id, or None.
+        """
+        i = bisect_left(self.person_ids, person_id)
+        if i < len(self.person_ids) and self.person_ids[i] == person_id:
+            return i
+        return None
+
+    def movie_index(self, movie_id):
+        """
+        Returns the interned index of an IMDB movie id, or None.
+        """
+        i = bisect_left(self.movie_ids, movie_id)
+        if i < len(self.movie_ids) and self.movie_ids[i] == movie_id:
+            return i
+        return None
+
+    def person_ids_for_name(self, name):
+        """
+        Returns the IMDB ids of every person with the given name,
+        ignoring case.
+        """
+        name = name.lower()
+        names = self.names
+        order = self.name_order
+        i = bisect_left(order, name, key=lambda person: names[person].lower())
+        person_ids = []
+        while i < len(order) and names[order[i]].lower() == name:
+            person_ids.append(self.person_ids[order[i]])
+            i += 1
+        return person_ids
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) index pairs for people who starred
+        with the person at index `person`.
+        """
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+        for k in range(self.person_offsets[person],
+                       self.person_offsets[person + 1]):
+            movie = person_movies[k]
+            for star in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                yield movie, movie_stars[star]
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target IMDB person ids.
+
+        If no possible path, returns None.
+        """
+        path = self.search(self.person_index(source), self.person_index(target))
+        if path is None:
+            return None
+        return [(self.movie_ids[movie], self.person_ids[person])
+                for movie, person in path]
+
+    def search(self, source, target):
+        """
+        Bidirectional breadth-first search between two person indexes.
+
+        Returns the shortest list of (movie, person) index pairs from the
+        source to the target, or None if they are not connected.
+        """
+        if source is None or target is None:
+            return None
+        if source == target:
+            return []
+
+        # Use landmark distances to answer without searching where possible
+        upper = None
+        if self.landmarks is not None:
+            bounds = self.landmarks.bounds(source, target)
+            if bounds is None:
+                return None
+            lower, upper = bounds
+            if upper is not None and lower == upper:
+                return self.landmarks.path_through(source, target)
+
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+
+        # Maps person to (movie, person) of the step towards each end
+        parents_source = {source: None}
+        parents_target = {target: None}
+        depths_source = {source: 0}
+        depths_target = {target: 0}
+        frontier_source = [source]
+        frontier_target = [target]
+
+        while frontier_source and frontier_target:
+            # With no meeting yet, the distance exceeds both search depths,
+            # so once that reaches the landmark bound the bound is exact
+            if upper is not None and (depths_source[frontier_source[0]]
+                                      + depths_target[frontier_target[0]]
+                                      + 1 >= upper):
+                return self.landmarks.path_through(source, target)
+
+            # Expand the smaller frontier to keep the search balanced
+            if len(frontier_source) <= len(frontier_target):
+                frontier, parents, depths = (
+                    frontier_source, parents_source, depths_source
+                )
+                other_depths = depths_target
+            else:
+                frontier, parents, depths = (
+                    frontier_target, parents_target, depths_target
+                )
+                other_depths = depths_source
+
+            # Expand a full layer so the best meeting point is found
+            best = None
+            meeting = None
+            next_frontier = []
+            for person in frontier:
+                depth = depths[person] + 1
+                for k in range(person_offsets[person],
+                               person_offsets[person + 1]):
+                    movie = person_movies[k]
+                    for star in range(movie_offsets[movie],
+                                      movie_offsets[movie + 1]):
+                        neighbor = movie_stars[star]
+                        if neighbor in depths:
+                            continue
+                        parents[neighbor] = (movie, person)
+                        depths[neighbor] = depth
+                        next_frontier.append(neighbor)
+
+                        if neighbor in other_depths:
+                            length = depth + other_depths[neighbor]
+                            if best is None or length < best:
+                                best = length
+                                meeting = neighbor
+
+            if meeting is not None:
+                return join_paths(meeting, parents_source, parents_target)
+
+            if frontier is frontier_source:
+                frontier_source = next_frontier
+            else:
+                frontier_target = next_frontier
+
+        return None
+
+    def distances(self, source):
+        """
+        Breadth-first search from one person index to every person.
+
+        Returns `(distances, parents)` arrays indexed by person, where
+        `distances[p]` is the degrees of separation between the source and
+        `p` (-1 if not connected), and `parents[p]` is the person before
+        `p` on a shortest path from the source (-1 if there is none).
+        """
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+
+        distances = array("h", [-1]) * len(self.person_ids)
+        parents = array("i", [-1]) * len(self.person_ids)
+        distances[source] = 0
+
+        # All stars of a movie are reached the first time it is expanded
+        expanded = bytearray(len(self.movie_ids))
+
+        depth = 0
+        frontier = [source]
+        while frontier:
+            depth += 1
+            next_frontier = []
+            for person in frontier:
+                for k in range(person_offsets[person],
+                               person_offsets[person + 1]):
+                    movie = person_movies[k]
+                    if expanded[movie]:
+                        continue
+                    expanded[movie] = 1
+                    for star in range(movie_offsets[movie],
+                                      movie_offsets[movie + 1]):
+                        neighbor = movie_stars[star]
+                        if distances[neighbor] == -1:
+                            distances[neighbor] = depth
+                            parents[neighbor] = person
+                            next_frontier.append(neighbor)
+            frontier = next_frontier
+
+        return distances, parents
+
+    def common_movie(self, person1, person2):
+        """
+        Returns the index of a movie both people starred in, or None.
+        """
+        movies1 = self.person_movies[self.person_offsets[person1]:
+                                     self.person_offsets[person1 + 1]]
+        movies2 = set(self.person_movies[self.person_offsets[person2]:
+                                         self.person_offsets[person2 + 1]])
+        for movie in movies1:
+            if movie in movies2:
+                return movie
+        return None
+
+
+class StringTable(Sequence):
+    """
+    Read-only sequence of strings stored as one UTF-8 buffer,
+    where string `i` is `data[offsets[i]:offsets[i + 1]]`.
+    """
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if not 0 <= i < len(self.offsets) - 1:
+            raise IndexError("string table index out of range")
+        return str(self.data[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+
+def load_graph(directory):
+    """
+    Loads the graph of the CSV files in `directory`.
+
+    Memory-maps the snapshot next to the CSV files if it is up to date;
+    otherwise parses the CSV files and writes a new snapshot.
+    """
+    return load_or_build(os.path.join(directory, SNAPSHOT),
+                         source_stamp(directory), Graph.load,
+                         lambda: Graph.from_csv(directory))
+
+
+def source_stamp(directory):
+    """
+    Returns the [size, mtime] of each CSV file a snapshot is built from.
+    """
+    stamp = []
+    for source in SOURCES:
+        stat = os.stat(os.path.join(directory, source))
+        stamp.append([stat.st_size, stat.st_mtime_ns])
+    return stamp
+
+
+def load_or_build(path, stamp, load, build):
+    """
+    Returns `load(path, stamp)`, or if the snapshot at `path` is
+    missing, out of date or damaged, the result of `build()`, saved to
+    `path` for next time if the directory is writable.
+    """
+    try:
+        return load(path, stamp)
+    except (OSError, ValueError, KeyError, struct.error):
+        pass
+
+    built = build()
+    try:
+        built.save(path, stamp)
+    except OSError:
+        pass
+    return built
+
+
+def read_snapshot(path, stamp=None):
+    """
+    Memory-maps a snapshot file.
+
+    Returns a dictionary of its named sections, as memoryviews into the
+    mapping. Raises ValueError if the file is not a
+    snapshot, is truncated or damaged, or if `stamp` is given and does
+    not match the saved stamp.
+    """
+    with open(path, "rb") as f:
+        snapshot = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    start = len(SNAPSHOT_MAGIC) + 8
+    if (len(snapshot) < start
+            or snapshot[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC):
+        raise ValueError("not a degrees snapshot")
+    (length,) = struct.unpack_from("<Q", snapshot, len(SNAPSHOT_MAGIC))
+    if start + length > len(snapshot):
+        raise ValueError("snapshot header is truncated")
+    header = json.loads(snapshot[start:start + length])
+    try:
+        byteorder = header["byteorder"]
+        saved_stamp = header["stamp"]
+        extents = [(name, int(offset), int(size))
+                   for name, (offset, size) in header["sections"].items()]
+    except (KeyError, TypeError, ValueError, AttributeError):
+        raise ValueError("snapshot header is damaged")
+    if byteorder != sys.byteorder:
+        raise ValueError("snapshot written on a different byte order")
+    if stamp is not None and saved_stamp != stamp:
+        raise ValueError("snapshot is out of date")
+
+    # Sections are views into the mapped file, nothing is copied; the
+    # views keep the mapping open for as long as any of them is in use
+    view = memoryview(snapshot)
+    start = align(start + length)
+    sections = {}
+    for name, offset, size in extents:
+        if offset < 0 or size < 0 or start + offset + size > len(snapshot):
+            raise ValueError(f"snapshot section {name} is truncated")
+        sections[name] = view[start + offset:start + offset + size]
+    return sections
+
+
+def cast(section, code):
+    """
+    Returns a snapshot section as an array of the given type code,
+    raising ValueError if its size does not fit the type.
+    """
+    view = section.cast("B")
+    if len(view) % struct.calcsize(code):
+        raise ValueError("snapshot section has a partial item")
+    return view.cast(code)
+
+
+def write_snapshot(path, chunks, stamp=None):
+    """
+    Writes (name, bytes) chunks to a snapshot file that `read_snapshot`
+    can memory-map, each aligned to 8 bytes.
+    """
+    sections = {}
+    position = 0
+    for name, chunk in chunks:
+        sections[name] = [position, len(chunk)]
+        position += align(len(chunk))
+    header = json.dumps({
+        "byteorder": sys.byteorder,
+        "stamp": stamp,
+        "sections": sections
+    }).encode()
+
+    # Write to a temporary file first so readers never see a partial one
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        f.write(bytes(align(f.tell()) - f.tell()))
+        for name, chunk in chunks:
+            f.write(chunk)
+            f.write(bytes(align(len(chunk)) - len(chunk)))
+    os.replace(temporary, path)
+
+
+def pack_strings(strings):
+    """
+    Encodes strings into an offsets array and one UTF-8 buffer.
+    """
+    offsets = array("q", [0])
+    data = bytearray()
+    for string in strings:
+        data += string.encode("utf-8")
+        offsets.append(len(data))
+    return offsets, bytes(data)
+
+
+def align(position):
+    """
+    Rounds a file position up to the next multiple of 8 bytes.
+    """
+    return (position + 7) // 8 * 8
+
+
+def compress(rows, row_indexes, column_indexes):
+    """
+    Builds compressed sparse rows from parallel arrays of row and column
+    indexes, with a counting sort.
+
+    Returns `(offsets, columns)` arrays, where the columns of row `r`
+    are `columns[offsets[r]:offsets[r + 1]]`, in input order.
+    """
+    offsets = array("i", bytes(4 * (rows + 1)))
+    for row in row_indexes:
+        offsets[row + 1] += 1
+    for row in range(rows):
+        offsets[row + 1] += offsets[row]
+
+    columns = array("i", bytes(4 * len(column_indexes)))
+    positions = offsets[:-1]
+    for row, column in zip(row_indexes, column_indexes):
+        columns[positions[row]] = column
+        positions[row] += 1
+    return offsets, columns
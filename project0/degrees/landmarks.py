@@ -0,0 +1,150 @@
+import os
+from array import array
+
+from graph import (cast, load_or_build, read_snapshot, source_stamp,
+                   write_snapshot)
+
+# File name of the landmark index written next to the CSV files
+LANDMARKS = "degrees.landmarks"
+
+
+class LandmarkIndex():
+    """
+    Breadth-first search trees from a few high-degree people.
+
+    For any landmark `L`, the distance between two people `s` and `t`
+    is at least `|d(L, s) - d(L, t)|` and at most `d(L, s) + d(L, t)`,
+    so the trees give instant bounds on every query, and a path through
+    a landmark whenever the bounds meet.
+    """
+
+    def __init__(self, graph, landmarks, distances, parents):
+        self.graph = graph
+
+        # Person indexes of the landmarks
+        self.landmarks = landmarks
+
+        # Per landmark, distances and parents arrays from Graph.distances
+        self.distances = distances
+        self.parents = parents
+
+    @classmethod
+    def build(cls, graph, k=8):
+        """
+        Builds an index over the `k` people who starred in the most movies.
+        """
+        degrees = [graph.person_offsets[p + 1] - graph.person_offsets[p]
+                   for p in range(len(graph.person_ids))]
+        landmarks = sorted(range(len(degrees)), key=lambda p: -degrees[p])[:k]
+        distances = []
+        parents = []
+        for landmark in landmarks:
+            tree = graph.distances(landmark)
+            distances.append(tree[0])
+            parents.append(tree[1])
+        return cls(graph, array("i", landmarks), distances, parents)
+
+    @classmethod
+    def load(cls, graph, path, stamp=None):
+        """
+        Memory-maps an index written by `save`.
+        """
+        sections = read_snapshot(path, stamp)
+        landmarks = cast(sections["landmarks"], "i")
+        return cls(
+            graph,
+            landmarks,
+            [cast(sections[f"distances.{i}"], "h")
+             for i in range(len(landmarks))],
+            [cast(sections[f"parents.{i}"], "i")
+             for i in range(len(landmarks))]
+        )
+
+    def save(self, path, stamp=None):
+        """
+        Writes the index to a binary snapshot that `load` can memory-map.
+        """
+        chunks = [("landmarks", array("i", self.landmarks).tobytes())]
+        for i in range(len(self.landmarks)):
+            chunks.append((f"distances.{i}",
+                           array("h", self.distances[i]).tobytes()))
+            chunks.append((f"parents.{i}",
+                           array("i", self.parents[i]).tobytes()))
+        write_snapshot(path, chunks, stamp)
+
+    def bounds(self, source, target):
+        """
+        Returns `(lower, upper)` bounds on the degrees of separation
+        between two person indexes, or None if they are not connected.
+
+        `upper` is None if no landmark is connected to either person.
+        """
+        lower = 0
+        upper = None
+        for distances in self.distances:
+            distance_source = distances[source]
+            distance_target = distances[target]
+
+            # A landmark connected to only one of them separates them
+            if (distance_source == -1) != (distance_target == -1):
+                return None
+            if distance_source == -1:
+                continue
+
+            lower = max(lower, abs(distance_source - distance_target))
+            if upper is None or distance_source + distance_target < upper:
+                upper = distance_source + distance_target
+        return lower, upper
+
+    def path_through(self, source, target):
+        """
+        Returns the list of (movie, person) index pairs from the source to
+        the target through the landmark closest to both.
+
+        The path is a shortest one whenever the landmark bounds meet.
+        """
+        best = None
+        for i, distances in enumerate(self.distances):
+            if distances[source] == -1:
+                continue
+            length = distances[source] + distances[target]
+            if best is None or length < best:
+                best = length
+                parents = self.parents[i]
+
+        # Walk up the tree from each end towards the landmark
+        up = [source]
+        while parents[up[-1]] != -1:
+            up.append(parents[up[-1]])
+        down = [target]
+        while parents[down[-1]] != -1:
+            down.append(parents[down[-1]])
+        people = up + down[-2::-1]
+
+        return [(self.graph.common_movie(person, following), following)
+                for person, following in zip(people, people[1:])]
+
+    def distances_from(self, person):
+        """
+        Returns `(distances, parents)` arrays from a person index,
+        reusing the landmark's tree if the person is a landmark.
+        """
+        for i, landmark in enumerate(self.landmarks):
+            if landmark == person:
+                return self.distances[i], self.parents[i]
+        return self.graph.distances(person)
+
+
+def load_landmarks(graph, directory, k=8):
+    """
+    Loads the landmark index of the graph of the CSV files in `directory`.
+
+    Memory-maps the index next to the CSV files if it is up to date;
+    otherwise builds it and writes it there.
+    """
+    return load_or_build(
+        os.path.join(directory, LANDMARKS),
+        source_stamp(directory) + [k],
+        lambda path, stamp: LandmarkIndex.load(graph, path, stamp),
+        lambda: LandmarkIndex.build(graph, k)
+    )
@@ -0,0 +1,373 @@
+import heapq
+import os
+from array import array
+from bisect import bisect_left
+
+from graph import (StringTable, cast, load_or_build, pack_strings,
+                   read_snapshot, source_stamp, write_snapshot)
+
+# File name of the name index written next to the CSV files
+NAME_INDEX = "degrees.names"
+
+# Most people a typo-tolerant search checks against the whole query
+FUZZY_CANDIDATES = 1000
+
+
+class NameIndex():
+    """
+    Non-interactive lookup of people by name.
+
+    Prefix search walks the graph's people sorted by lowercase name.
+    Typo-tolerant search splits names into words: each distinct word
+    maps to the people whose names contain it, and each trigram of a
+    padded word maps to the words containing it, all stored as sorted
+    string tables and compressed sparse rows. Short words have too few
+    trigrams to find every near miss by, so each word is also indexed
+    under itself and each way of deleting one of its letters: two words
+    one edit apart always share such a key.
+    """
+
+    def __init__(self, graph, words, word_offsets, word_people,
+                 trigrams, trigram_offsets, trigram_words,
+                 deletions, deletion_offsets, deletion_words):
+        self.graph = graph
+
+        # Sorted distinct words, and the people with each word in their name
+        self.words = words
+        self.word_offsets = word_offsets
+        self.word_people = word_people
+
+        # Sorted distinct trigrams, and the words containing each trigram
+        self.trigrams = trigrams
+        self.trigram_offsets = trigram_offsets
+        self.trigram_words = trigram_words
+
+        # Sorted distinct deletion keys, and the words with each key
+        self.deletions = deletions
+        self.deletion_offsets = deletion_offsets
+        self.deletion_words = deletion_words
+
+    @classmethod
+    def build(cls, graph):
+        """
+        Builds the word and trigram indexes of the graph's names.
+        """
+        people_by_word = {}
+        for person in range(len(graph.person_ids)):
+            for word in set(graph.names[person].lower().split()):
+                if word not in people_by_word:
+                    people_by_word[word] = array("i")
+                people_by_word[word].append(person)
+        words = sorted(people_by_word)
+        word_offsets, word_people = concatenate(
+            people_by_word.pop(word) for word in words
+        )
+
+        words_by_trigram = {}
+        for i, word in enumerate(words):
+            for trigram in set(trigrams_for(word)):
+                if trigram not in words_by_trigram:
+                    words_by_trigram[trigram] = array("i")
+                words_by_trigram[trigram].append(i)
+        trigrams = sorted(words_by_trigram)
+        trigram_offsets, trigram_words = concatenate(
+            words_by_trigram.pop(trigram) for trigram in trigrams
+        )
+
+        words_by_deletion = {}
+        for i, word in enumerate(words):
+            for key in deletions_for(word):
+                if key not in words_by_deletion:
+                    words_by_deletion[key] = array("i")
+                words_by_deletion[key].append(i)
+        deletions = sorted(words_by_deletion)
+        deletion_offsets, deletion_words = concatenate(
+            words_by_deletion.pop(key) for key in deletions
+        )
+
+        return cls(graph, words, word_offsets, word_people,
+                   trigrams, trigram_offsets, trigram_words,
+                   deletions, deletion_offsets, deletion_words)
+
+    @classmethod
+    def load(cls, graph, path, stamp=None):
+        """
+        Memory-maps an index written by `save`.
+        """
+        sections = read_snapshot(path, stamp)
+        return cls(
+            graph,
+            StringTable(cast(sections["words.offsets"], "q"),
+                        sections["words.data"]),
+            cast(sections["word_offsets"], "i"),
+            cast(sections["word_people"], "i"),
+            StringTable(cast(sections["trigrams.offsets"], "q"),
+                        sections["trigrams.data"]),
+            cast(sections["trigram_offsets"], "i"),
+            cast(sections["trigram_words"], "i"),
+            StringTable(cast(sections["deletions.offsets"], "q"),
+                        sections["deletions.data"]),
+            cast(sections["deletion_offsets"], "i"),
+            cast(sections["deletion_words"], "i")
+        )
+
+    def save(self, path, stamp=None):
+        """
+        Writes the index to a binary snapshot that `load` can memory-map.
+        """
+        chunks = []
+        for name in ("words", "trigrams", "deletions"):
+            offsets, data = pack_strings(getattr(self, name))
+            chunks.append((f"{name}.offsets", offsets.tobytes()))
+            chunks.append((f"{name}.data", data))
+        for name in ("word_offsets", "word_people",
+                     "trigram_offsets", "trigram_words",
+                     "deletion_offsets", "deletion_words"):
+            chunks.append((name, array("i", getattr(self, name)).tobytes()))
+        write_snapshot(path, chunks, stamp)
+
+    def candidate(self, person):
+        """
+        Returns a dictionary of id, name and birth for a person index.
+        """
+        return {
+            "id": self.graph.person_ids[person],
+            "name": self.graph.names[person],
+            "birth": self.graph.births[person]
+        }
+
+    def prefix(self, prefix, limit=10):
+        """
+        Returns up to `limit` people whose names start with `prefix`,
+        ignoring case, in alphabetical order (so exact matches first).
+        """
+        prefix = prefix.lower()
+        names = self.graph.names
+        order = self.graph.name_order
+        i = bisect_left(order, prefix,
+                        key=lambda person: names[person].lower())
+        candidates = []
+        while (i < len(order) and len(candidates) < limit
+               and names[order[i]].lower().startswith(prefix)):
+            candidates.append(self.candidate(order[i]))
+            i += 1
+        return candidates
+
+    def fuzzy(self, name, limit=10, max_distance=2):
+        """
+        Returns up to `limit` people whose names contain a word within
+        `max_distance` edits of each word of `name`, ignoring case.
+
+        Candidates are ranked by total edit distance, then by how many
+        words their names have beyond the query, then by how many movies
+        they starred in.
+
+        Only the people matching one query word are visited, closest
+        matches first and at most FUZZY_CANDIDATES of them, each checked
+        against the other words: the word with the fewest people among
+        its closest matches, so that these are all visited.
+        """
+        words = name.lower().split()
+        if not words:
+            return []
+
+        # For each query word, the distance of each similar indexed word,
+        # and how many people have one of the closest of them, then one
+        # of any of them
+        matches = []
+        for word in words:
+            distances = {}
+            people = [0] * (max_distance + 1)
+            for i, distance in self.similar_words(word, max_distance):
+                distances[i] = distance
+                people[distance] += (self.word_offsets[i + 1]
+                                     - self.word_offsets[i])
+            if not distances:
+                return []
+            closest = people[min(distances.values())]
+            matches.append(((closest, sum(people)), distances))
+        matches.sort(key=lambda match: match[0])
+        rarest = matches[0][1]
+        others = [{self.words[i]: distance for i, distance in distances.items()}
+                  for _, distances in matches[1:]]
+
+        ranked = []
+        seen = set()
+        for i in sorted(rarest, key=rarest.get):
+            for person in self.word_people[self.word_offsets[i]:
+                                           self.word_offsets[i + 1]]:
+                if person in seen:
+                    continue
+                seen.add(person)
+                if len(seen) > FUZZY_CANDIDATES:
+                    break
+
+                # Add the closest word of the name to each other query word
+                name = self.graph.names[person]
+                name_words = name.lower().split()
+                distance = rarest[i]
+                for other in others:
+                    closest = min((other[w] for w in name_words if w in other),
+                                  default=None)
+                    if closest is None:
+                        break
+                    distance += closest
+                else:
+                    extra = len(name_words) - len(words)
+                    movies = (self.graph.person_offsets[person + 1]
+                              - self.graph.person_offsets[person])
+                    ranked.append((distance, extra, -movies, name, person))
+            if len(seen) > FUZZY_CANDIDATES:
+                break
+
+        return [self.candidate(match[-1])
+                for match in heapq.nsmallest(limit, ranked)]
+
+    def similar_words(self, word, max_distance):
+        """
+        Yields (word index, edit distance) for indexed words within
+        `max_distance` edits of `word`.
+
+        Every such word is found if `word` is long enough for the words
+        to share trigrams; for short words, every word one edit away is
+        found, and words further away only if they share a trigram.
+        """
+        query = set(trigrams_for(word))
+
+        # Count shared trigrams per word
+        shared = {}
+        for trigram in query:
+            for i in sparse_row(trigram, self.trigrams,
+                                self.trigram_offsets, self.trigram_words):
+                shared[i] = shared.get(i, 0) + 1
+
+        # Each edit changes at most 3 trigrams
+        minimum = len(query) - 3 * max_distance
+        candidates = {i for i, count in shared.items() if count >= minimum}
+        if minimum <= 0:
+
+            # Too short to rule out words sharing no trigram, so add the
+            # words one edit away by their deletion keys
+            for key in deletions_for(word):
+                candidates.update(sparse_row(key, self.deletions,
+                                             self.deletion_offsets,
+                                             self.deletion_words))
+
+        distance_to = distance_from(word, max_distance)
+        for i in candidates:
+            distance = distance_to(self.words[i])
+            if distance <= max_distance:
+                yield i, distance
+
+    def search(self, name, limit=10):
+        """
+        Returns up to `limit` ranked candidates for a name: exact matches,
+        then prefix matches, then typo-tolerant matches.
+        """
+        prefixed = self.prefix(name, limit)
+        if len(prefixed) == limit:
+            return prefixed
+        candidates = []
+        seen = set()
+        for candidate in prefixed + self.fuzzy(name, limit):
+            if candidate["id"] not in seen:
+                seen.add(candidate["id"])
+                candidates.append(candidate)
+        return candidates[:limit]
+
+
+def trigrams_for(word):
+    """
+    Returns the trigrams of a word padded with a space on each side.
+    """
+    padded = f" {word} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def deletions_for(word):
+    """
+    Returns the set of a word and the words made by deleting one letter.
+    """
+    return {word} | {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+def sparse_row(key, keys, offsets, values):
+    """
+    Returns the values of a key in compressed sparse rows keyed by a
+    sorted sequence, or an empty range if the key is absent.
+    """
+    k = bisect_left(keys, key)
+    if k == len(keys) or keys[k] != key:
+        return range(0)
+    return values[offsets[k]:offsets[k + 1]]
+
+
+def distance_from(word, limit):
+    """
+    Returns a function of a string that returns its Levenshtein distance
+    from `word`, or `limit + 1` if the lengths alone rule out `limit`.
+
+    Uses Myers' bit-parallel algorithm, in Hyyrö's form for whole
+    strings: bit i of `plus` and `minus` says whether the distance to
+    the first i + 1 letters of `word` goes up or down from the first i,
+    so each letter of the other string costs a few operations on ints.
+    """
+    masks = {}
+    for i, c in enumerate(word):
+        masks[c] = masks.get(c, 0) | 1 << i
+    full = (1 << len(word)) - 1
+    last = 1 << len(word) >> 1
+
+    def distance(other):
+        if abs(len(word) - len(other)) > limit:
+            return limit + 1
+        if not word:
+            return len(other)
+        plus, minus, score = full, 0, len(word)
+        for c in other:
+            eq = masks.get(c, 0)
+            vertical = eq | minus
+            horizontal = (((eq & plus) + plus) ^ plus) | eq
+            up = minus | (~(horizontal | plus) & full)
+            down = plus & horizontal
+            if up & last:
+                score += 1
+            elif down & last:
+                score -= 1
+            up = (up << 1 | 1) & full
+            down = (down << 1) & full
+            plus = down | (~(vertical | up) & full)
+            minus = up & vertical
+        return score
+
+    return distance
+
+
+def concatenate(postings):
+    """
+    Concatenates arrays of ints into compressed sparse rows.
+
+    Returns `(offsets, values)` arrays, where the values of row `r`
+    are `values[offsets[r]:offsets[r + 1]]`.
+    """
+    offsets = array("i", [0])
+    values = array("i")
+    for posting in postings:
+        values.extend(posting)
+        offsets.append(len(values))
+    return offsets, values
+
+
+def load_name_index(graph, directory):
+    """
+    Loads the name index of the graph of the CSV files in `directory`.
+
+    Memory-maps the index next to the CSV files if it is up to date;
+    otherwise builds it and writes it there.
+    """
+    return load_or_build(
+        os.path.join(directory, NAME_INDEX),
+        source_stamp(directory),
+        lambda path, stamp: NameIndex.load(graph, path, stamp),
+        lambda: NameIndex.build(graph)
+    )
@@ -0,0 +1,58 @@
+import multiprocessing
+
+# Graph inherited by forked workers, set just before the pool starts
+shared_graph = None
+
+
+def pool_map(graph, function, items, processes=None, chunksize=16):
+    """
+    Yields `function(graph, item)` for each of `items`, in input order,
+    computed across a pool of worker processes.
+
+    Workers are forked after `graph` is set, so they share its memory
+    copy-on-write (and its snapshot mapping) instead of receiving a
+    pickled copy per task. Only `items` and the results are pickled.
+    Runs in this process if forking is not available.
+    """
+    global shared_graph
+
+    if "fork" not in multiprocessing.get_all_start_methods() or processes == 1:
+        for item in items:
+            yield function(graph, item)
+        return
+
+    shared_graph = graph
+    context = multiprocessing.get_context("fork")
+    try:
+        with context.Pool(processes) as pool:
+            yield from pool.imap(
+                call_with_graph, ((function, item) for item in items),
+                chunksize
+            )
+    finally:
+        shared_graph = None
+
+
+def call_with_graph(task):
+    """
+    Runs one task in a worker against the graph it inherited.
+    """
+    function, item = task
+    return function(shared_graph, item)
+
+
+def shortest_paths(graph, pairs, processes=None):
+    """
+    Returns `graph.shortest_path(source, target)` for each
+    (source, target) pair of IMDB person ids, in input order,
+    computing independent queries in parallel.
+    """
+    return list(pool_map(graph, shortest_path, pairs, processes))
+
+
+def shortest_path(graph, pair):
+    """
+    Returns the shortest path for one (source, target) pair.
+    """
+    source, target = pair
+    return graph.shortest_path(source, target)
@@ -0,0 +1,159 @@
+import csv
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from parallel import pool_map
+
+
+def resolve_person(graph, name):
+    """
+    Returns the IMDB id for a person's name or id, without prompting.
+
+    Raises LookupError if no person or more than one person matches.
+    """
+    if graph.person_index(name) is not None:
+        return name
+    person_ids = graph.person_ids_for_name(name)
+    if len(person_ids) == 0:
+        raise LookupError(f"Person not found: {name}")
+    elif len(person_ids) > 1:
+        raise LookupError(
+            f"Ambiguous name: {name} ({', '.join(person_ids)})"
+        )
+    return person_ids[0]
+
+
+def answer(graph, source, target):
+    """
+    Returns a JSON-serializable answer to one separation query between
+    two names or IMDB ids.
+    """
+    result = {"source": source, "target": target}
+    person_ids = []
+    for name in (source, target):
+        try:
+            person_ids.append(resolve_person(graph, name))
+        except LookupError as e:
+            result["error"] = str(e)
+
+            # Suggest who may have been meant, if anyone was named
+            if graph.name_index is not None:
+                result["candidates"] = (graph.name_index.search(name)
+                                        if name else [])
+            return result
+    source_id, target_id = person_ids
+
+    path = graph.shortest_path(source_id, target_id)
+    result["source_id"] = source_id
+    result["target_id"] = target_id
+    result["degrees"] = None if path is None else len(path)
+    result["path"] = None if path is None else [
+        {
+            "movie_id": movie_id,
+            "movie": graph.movie(movie_id)["title"],
+            "person_id": person_id,
+            "person": graph.person(person_id)["name"]
+        }
+        for movie_id, person_id in path
+    ]
+    return result
+
+
+def answer_row(graph, row):
+    """
+    Answers a query given as a parsed `source,target` CSV row.
+    """
+    if len(row) != 2:
+        return {"query": row, "error": "Expected source,target"}
+    return answer(graph, row[0].strip(), row[1].strip())
+
+
+def run_batch(graph, lines, out, processes=None):
+    """
+    Answers one `source,target` query per line of `lines`, writing one
+    JSON answer per line to `out` as soon as it is found.
+
+    With `processes`, queries are answered by that many worker processes
+    sharing the graph, and still written in input order.
+    """
+    # Skip blank lines
+    rows = (row for row in csv.reader(lines, skipinitialspace=True) if row)
+    if processes is None:
+        results = (answer_row(graph, row) for row in rows)
+    else:
+        results = pool_map(graph, answer_row, rows, processes)
+
+    for result in results:
+        out.write(json.dumps(result) + "\n")
+        out.flush()
+
+
+def serve(graph, port, host="127.0.0.1"):
+    """
+    Serves separation queries as JSON over HTTP until interrupted.
+
+    GET /?source=...&target=... answers a single query, and POST / with
+    `source,target` lines in the body answers each line in turn.
+    GET /names?q=... returns ranked candidates for a partial or misspelt
+    name, if the graph has a name index.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+
+        # Keep connections open between queries
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            if url.path == "/names":
+                if "q" not in query or graph.name_index is None:
+                    self.send_json(400, {"error": "Expected q"})
+                else:
+                    self.send_json(200, graph.name_index.search(query["q"][0]))
+            elif "source" not in query or "target" not in query:
+                self.send_json(400, {"error": "Expected source and target"})
+            else:
+                self.send_json(200, answer(graph, query["source"][0],
+                                           query["target"][0]))
+
+        def do_POST(self):
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                if length < 0:
+                    raise ValueError(length)
+            except ValueError:
+                # The body cannot be skipped without its length
+                self.close_connection = True
+                self.send_json(400, {"error": "Expected Content-Length"})
+                return
+            try:
+                lines = self.rfile.read(length).decode("utf-8").splitlines()
+            except UnicodeDecodeError:
+                self.send_json(400, {"error": "Expected UTF-8 body"})
+                return
+            self.send_json(200, [
+                answer_row(graph, row)
+                for row in csv.reader(lines, skipinitialspace=True) if row
+            ])
+
+        def send_json(self, status, body):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            # Don't log every query to stderr
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,22 @@
+from graph import Graph
+from lookup import NameIndex
+
+graph = Graph.from_csv("small")
+names = NameIndex.build(graph)
+
+"""
+    FUZZY
+"""
+print("----- FUZZY -----")
+# 1 -- finds Kevin Bacon for a one-letter typo ✅
+print("1 --", [person["name"] for person in names.fuzzy("Kevin Bakon")])
+
+# 2 -- finds Tom Hanks for a one-letter typo in a 3-letter word ✅
+print("2 --", [person["name"] for person in names.fuzzy("Tim Hanks")])
+
+# 3 -- finds Tom Cruise for a one-letter typo in a 3-letter word ✅
+print("3 --", [person["name"] for person in names.fuzzy("Tom Crose")])
+
+# 4 -- returns [] for a name far from every name ✅
+print("4 --", names.fuzzy("Zzzzzz Qqqqqq"))
+print('\n')
@@ -1,3 +1,14 @@
+import csv
+import sys
+from collections import deque
+from operator import itemgetter
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
@@ -7,13 +18,17 @@ class Node():
 
 class StackFrontier():
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+
+        # Counts how many nodes in the frontier hold each state
+        self.states = {}
 
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
@@ -22,10 +37,17 @@ class StackFrontier():
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.discard_state(node.state)
             return node
 
+    def discard_state(self, state):
+        count = self.states[state] - 1
+        if count:
+            self.states[state] = count
+        else:
+            del self.states[state]
+
     def is_goal(self, source, target):
         return source == target
 
@@ -37,6 +59,81 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self.discard_state(node.state)
             return node
+
+
+def join_paths(meeting, parents_source, parents_target):
+    """
+    Builds the list of (movie, person) pairs from the source to the
+    target through the person where both searches met.
+    """
+    # Walk back from the meeting point to the source
+    actions = []
+    person = meeting
+    while parents_source[person] is not None:
+        movie, previous = parents_source[person]
+        actions.append((movie, person))
+        person = previous
+    actions.reverse()
+
+    # Walk forward from the meeting point to the target
+    person = meeting
+    while parents_target[person] is not None:
+        movie, following = parents_target[person]
+        actions.append((movie, following))
+        person = following
+
+    return actions
+
+
+def read_csv(path, *columns):
+    """
+    Yields a tuple of the given columns for each row of a CSV file.
+
+    Rows are read as plain lists and picked by column index, so no dict
+    is built per row. Blank rows are skipped, as csv.DictReader does.
+    Raises ValueError if the file has no header row.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            raise ValueError(f"{path} has no header row")
+        pick = itemgetter(*[header.index(column) for column in columns])
+        for row in reader:
+            if not row:
+                continue
+            yield pick(row)
+
+
+def peak_rss():
+    """
+    Returns the peak resident set size of this process in MB,
+    or None if it cannot be measured on this platform.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # macOS reports bytes, other platforms kilobytes
+    if sys.platform == "darwin":
+        return peak / 2 ** 20
+    return peak / 2 ** 10
+
+
+def load_summary(rows, seconds):
+    """
+    Describes how long loading took, how fast rows were parsed,
+    and the peak memory of the process.
+    """
+    if rows:
+        summary = (f"Data loaded: {rows} rows in {seconds:.2f}s "
+                   f"({rows / seconds:.0f} rows/s)")
+    else:
+        summary = f"Data loaded from snapshot in {seconds:.3f}s"
+    rss = peak_rss()
+    if rss is not None:
+        summary += f", peak RSS {rss:.1f} MB"
+    return summary + "."
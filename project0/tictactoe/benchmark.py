@@ -0,0 +1,157 @@
+"""
+Benchmark and self-play harness for the Tic Tac Toe AI
+
+Times minimax from a fixed set of positions for each search, counting
+the nodes it visits, then plays AI-vs-AI and AI-vs-random games in worker
+processes, reporting moves per second and checking the AI never loses:
+
+    python benchmark.py [--games N] [--workers N] [--search SEARCH]
+"""
+
+import argparse
+import random
+import sys
+import time
+from multiprocessing import Pool
+
+import tictactoe as ttt
+
+X = ttt.X
+O = ttt.O
+EMPTY = ttt.EMPTY
+
+SEARCHES = ["transposition", "alphabeta", "bitboard", "book"]
+
+# Positions to time minimax from: the empty board, then 1, 2 and 3 moves in
+POSITIONS = [
+    ("empty", [[EMPTY, EMPTY, EMPTY],
+               [EMPTY, EMPTY, EMPTY],
+               [EMPTY, EMPTY, EMPTY]]),
+    ("1 move", [[EMPTY, EMPTY, EMPTY],
+                [EMPTY, X,     EMPTY],
+                [EMPTY, EMPTY, EMPTY]]),
+    ("2 moves", [[O,     EMPTY, EMPTY],
+                 [EMPTY, X,     EMPTY],
+                 [EMPTY, EMPTY, EMPTY]]),
+    ("3 moves", [[O,     EMPTY, EMPTY],
+                 [EMPTY, X,     EMPTY],
+                 [EMPTY, EMPTY, X]]),
+]
+
+
+def reset():
+    """
+    Forgets everything the searches cached, so each timing starts cold.
+    """
+    ttt.transposition_table.clear()
+    ttt.bitboard.transposition_table.clear()
+    ttt.nodes_visited = 0
+    ttt.bitboard.nodes_visited = 0
+
+
+def time_positions(search):
+    """
+    Returns (name, seconds, nodes visited) of a cold minimax call on
+    each benchmark position.
+    """
+    timings = []
+    for name, board in POSITIONS:
+        reset()
+        start = time.perf_counter()
+        ttt.minimax(board, search)
+        seconds = time.perf_counter() - start
+        nodes = ttt.nodes_visited + ttt.bitboard.nodes_visited
+        timings.append((name, seconds, nodes))
+    return timings
+
+
+def play(game):
+    """
+    Plays one game and returns (winner, moves made by the AI,
+    seconds the AI spent choosing them).
+
+    `game` is (search, opponent, ai_player, seed): the AI plays
+    `ai_player` with `search`, against itself if `opponent` is "ai", or
+    against uniformly random moves if it is "random".
+    """
+    search, opponent, ai_player, seed = game
+    rng = random.Random(seed)
+    board = ttt.initial_state()
+    moves = 0
+    thinking = 0.0
+    while not ttt.terminal(board):
+        if opponent == "ai" or ttt.player(board) == ai_player:
+            start = time.perf_counter()
+            action = ttt.minimax(board, search)
+            thinking += time.perf_counter() - start
+            moves += 1
+        else:
+            action = rng.choice(sorted(ttt.actions(board)))
+        board = ttt.result(board, action)
+    return ttt.winner(board), moves, thinking
+
+
+def self_play(search, opponent, games, workers):
+    """
+    Plays `games` games across `workers` processes, alternating which
+    player the AI takes, and returns their results in order.
+    """
+    jobs = [(search, opponent, X if i % 2 == 0 else O, i)
+            for i in range(games)]
+    with Pool(workers) as pool:
+        return pool.map(play, jobs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Tic Tac Toe AI.")
+    parser.add_argument("--games", type=int, default=200,
+                        help="games of self-play per opponent")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes to play games in")
+    parser.add_argument("--search", choices=SEARCHES, default=None,
+                        help="only benchmark this search")
+    args = parser.parse_args()
+    searches = [args.search] if args.search else SEARCHES
+
+    # Without book.bin the book search falls back to the transposition
+    # search, so timing it would only time that again
+    if "book" in searches and ttt.opening_book is None:
+        print("No opening book, skipping the book search; "
+              "run python book.py to build it.\n")
+        searches = [search for search in searches if search != "book"]
+
+    print("----- MINIMAX -----")
+    for search in searches:
+        for name, seconds, nodes in time_positions(search):
+            print(f"{search:>13} {name:>8}: {seconds * 1000:9.3f} ms, "
+                  f"{nodes} nodes")
+
+    print("\n----- SELF-PLAY -----")
+    failed = False
+    for search in searches:
+        for opponent in ["ai", "random"]:
+            results = self_play(search, opponent, args.games, args.workers)
+            moves = sum(result[1] for result in results)
+            thinking = sum(result[2] for result in results)
+            rate = moves / thinking if thinking else float("inf")
+
+            # Games the AI lost: any decided game against itself, or
+            # a game the random player won
+            losses = 0
+            for i, (winner, _, _) in enumerate(results):
+                ai_player = X if i % 2 == 0 else O
+                if winner is not None and (opponent == "ai"
+                                           or winner != ai_player):
+                    losses += 1
+            failed = failed or losses > 0
+
+            draws = sum(1 for result in results if result[0] is None)
+            print(f"{search:>13} vs {opponent:<6}: {len(results)} games, "
+                  f"{draws} draws, {losses} losses, {rate:.0f} moves/s")
+
+    if failed:
+        sys.exit("The AI lost a game.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Tic Tac Toe Player on bitboards
+
+A board is a tuple (x, o) of two 9-bit integers, where bit 3 * i + j
+is set if X (or O) has played cell (i, j).
+"""
+
+X = "X"
+O = "O"
+EMPTY = None
+SIZE = 3
+
+# Bits of a board with every cell filled
+FULL = (1 << SIZE * SIZE) - 1
+
+# Bits of every row, column and diagonal
+WIN_MASKS = (
+    [sum(1 << (SIZE * i + j) for j in range(SIZE)) for i in range(SIZE)]
+    + [sum(1 << (SIZE * i + j) for i in range(SIZE)) for j in range(SIZE)]
+    + [sum(1 << (SIZE * i + i) for i in range(SIZE)),
+       sum(1 << (SIZE * i + SIZE - 1 - i) for i in range(SIZE))]
+)
+
+# Maps (x, o) boards to their minimax value, so each position is solved once
+transposition_table = {}
+
+# Number of positions visited by the search, to compare its cost
+nodes_visited = 0
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return (0, 0)
+
+
+def from_board(board):
+    """
+    Returns the bitboard of a list-of-lists board as used by runner.py.
+    """
+    x = 0
+    o = 0
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell == X:
+                x |= 1 << (SIZE * i + j)
+            elif cell == O:
+                o |= 1 << (SIZE * i + j)
+    return (x, o)
+
+
+def to_board(state):
+    """
+    Returns the list-of-lists board of a bitboard, as used by runner.py.
+    """
+    x, o = state
+    board = []
+    for i in range(SIZE):
+        row = []
+        for j in range(SIZE):
+            bit = 1 << (SIZE * i + j)
+            row.append(X if x & bit else O if o & bit else EMPTY)
+        board.append(row)
+    return board
+
+
+def player(state):
+    """
+    Returns player who has the next turn on a board.
+    """
+    x, o = state
+    x_count = x.bit_count()
+    o_count = o.bit_count()
+    if x_count == o_count:
+        return X
+    elif o_count < x_count:
+        return O
+    else:
+        return None
+
+
+def actions(state):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    x, o = state
+    empty = ~(x | o) & FULL
+    return {divmod(k, SIZE) for k in range(SIZE * SIZE) if empty >> k & 1}
+
+
+def result(state, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    i, j = action
+    if i not in range(SIZE) or j not in range(SIZE):
+        raise ValueError("Invalid action type")
+
+    x, o = state
+    bit = 1 << (SIZE * i + j)
+    if (x | o) & bit:
+        raise ValueError("Invalid action: cell already in use")
+
+    if player(state) == X:
+        return (x | bit, o)
+    return (x, o | bit)
+
+
+def winner(state):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    x, o = state
+    for mask in WIN_MASKS:
+        if x & mask == mask:
+            return X
+        if o & mask == mask:
+            return O
+    return None
+
+
+def terminal(state):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    x, o = state
+    return (x | o) == FULL or winner(state) is not None
+
+
+def utility(state):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    win_player = winner(state)
+    if win_player == X:
+        return 1
+    elif win_player == O:
+        return -1
+    return 0
+
+
+def minimax(state):
+    """
+    Returns the optimal action for the current player on the board.
+    """
+    if terminal(state):
+        return None
+
+    x, o = state
+    x_turn = player(state) == X
+    best_action = None
+    best = None
+    empty = ~(x | o) & FULL
+    for k in range(SIZE * SIZE):
+        bit = 1 << k
+        if not empty & bit:
+            continue
+        if x_turn:
+            v = value(x | bit, o, False)
+        else:
+            v = value(x, o | bit, True)
+
+        # X keeps the highest value, O the lowest
+        if best is None or (v > best if x_turn else v < best):
+            best_action = divmod(k, SIZE)
+            best = v
+    return best_action
+
+
+def value(x, o, x_turn):
+    """
+    Returns the minimax value of the board (x, o) with the given player
+    to move, using only integer operations.
+    """
+    global nodes_visited
+    nodes_visited += 1
+
+    key = (x, o)
+    if key in transposition_table:
+        return transposition_table[key]
+
+    for mask in WIN_MASKS:
+        if x & mask == mask:
+            transposition_table[key] = 1
+            return 1
+        if o & mask == mask:
+            transposition_table[key] = -1
+            return -1
+
+    empty = ~(x | o) & FULL
+    if not empty:
+        transposition_table[key] = 0
+        return 0
+
+    if x_turn:
+        best = -1
+        while empty and best < 1:
+            bit = empty & -empty
+            empty ^= bit
+            best = max(best, value(x | bit, o, False))
+    else:
+        best = 1
+        while empty and best > -1:
+            bit = empty & -empty
+            empty ^= bit
+            best = min(best, value(x, o | bit, True))
+
+    transposition_table[key] = best
+    return best
@@ -0,0 +1,116 @@
+"""
+Perfect-play opening book for Tic Tac Toe
+
+Solves every position reachable from the initial state once and writes
+the best action and value of each to tictactoe.BOOK, which tictactoe
+loads at startup for minimax(board, search="book"):
+
+    python book.py
+"""
+
+import tictactoe as ttt
+
+
+def reachable_positions():
+    """
+    Returns every board reachable from the initial state, terminal or not.
+    """
+    boards = []
+    seen = set()
+    frontier = [ttt.initial_state()]
+    while frontier:
+        board = frontier.pop()
+        index = ttt.book_index(board)
+        if index in seen:
+            continue
+        seen.add(index)
+        boards.append(board)
+
+        if not ttt.terminal(board):
+            for action in ttt.actions(board):
+                frontier.append(ttt.result(board, action))
+    return boards
+
+
+def value(board):
+    """
+    Returns the minimax value of the board from the recursive search.
+    """
+    if ttt.player(board) == ttt.X:
+        return ttt.max_value(board)
+    return ttt.min_value(board)
+
+
+def solve():
+    """
+    Returns the opening book of every reachable position.
+    """
+    book = bytearray([ttt.BOOK_UNKNOWN]) * 3 ** (ttt.SIZE * ttt.SIZE)
+    for board in reachable_positions():
+        action = ttt.minimax(board, search="transposition")
+        book[ttt.book_index(board)] = ttt.book_entry(action, value(board))
+    return bytes(book)
+
+
+def write_book(book, path=ttt.BOOK):
+    """
+    Writes the opening book to disk, after the magic bytes that
+    tictactoe.load_book checks for.
+    """
+    with open(path, "wb") as f:
+        f.write(ttt.BOOK_MAGIC)
+        f.write(book)
+
+
+def verify(book):
+    """
+    Checks the book against the recursive minimax for every reachable
+    position: the stored value must be the board's value, and the stored
+    action must achieve it.
+
+    Returns the list of boards where the book is wrong.
+    """
+    # Recompute every value from scratch, without symmetric sharing
+    ttt.transposition_table.clear()
+    use_symmetry = ttt.USE_SYMMETRY
+    ttt.USE_SYMMETRY = False
+
+    opening_book = ttt.opening_book
+    ttt.opening_book = book
+    try:
+        wrong = []
+        for board in reachable_positions():
+            action, stored = ttt.book_lookup(board)
+            if stored != value(board):
+                wrong.append(board)
+            elif ttt.terminal(board):
+                if action is not None:
+                    wrong.append(board)
+            elif action not in ttt.actions(board) or (
+                value(ttt.result(board, action)) != stored
+            ):
+                wrong.append(board)
+        return wrong
+    finally:
+        ttt.opening_book = opening_book
+        ttt.USE_SYMMETRY = use_symmetry
+        ttt.transposition_table.clear()
+
+
+def main():
+    book = solve()
+    positions = sum(1 for entry in book if entry != ttt.BOOK_UNKNOWN)
+    write_book(book)
+    print(f"Solved {positions} positions, wrote {ttt.BOOK}")
+
+    wrong = verify(book)
+    if wrong:
+        print(f"{len(wrong)} positions disagree with minimax:")
+        for board in wrong:
+            print(board)
+    else:
+        print(f"Verified {positions} positions against minimax")
+
+
+if __name__ == "__main__":
+    main()
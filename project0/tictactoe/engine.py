@@ -0,0 +1,280 @@
+"""
+Tic Tac Toe engine for N x N boards with k in a row
+
+Full minimax is infeasible past 3 x 3, so the engine runs iterative
+deepening alpha-beta (negamax) under a time budget, scores unfinished
+positions with a heuristic, and keeps a transposition table of bounds
+and best moves between iterations and between moves.
+"""
+
+import time
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Score of a won position, less the plies it takes to win
+WIN = 10 ** 12
+
+# Scores within this distance of WIN are forced wins or losses
+MAX_PLY = 10 ** 4
+
+# Kinds of value stored in the transposition table
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+
+class SearchTimeout(Exception):
+    """
+    Raised inside the search when the time budget runs out.
+    """
+
+
+class Engine():
+
+    def __init__(self, size=3, k=3, radius=None):
+        """
+        Initialize an engine for `size` x `size` boards where `k` in a row
+        wins.
+
+        On boards larger than 5 x 5, only moves within `radius` cells of a
+        played stone are searched (2 by default), which keeps the branching
+        factor down without missing the moves that matter.
+        """
+        self.size = size
+        self.k = k
+        self.full = (1 << size * size) - 1
+
+        # Masks of every run of k cells in a row, column or diagonal
+        self.lines = []
+        for i in range(size):
+            for j in range(size):
+                for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    if (0 <= i + di * (k - 1) < size
+                            and 0 <= j + dj * (k - 1) < size):
+                        mask = 0
+                        for step in range(k):
+                            mask |= self.bit((i + di * step, j + dj * step))
+                        self.lines.append(mask)
+
+        # Lines through each cell, to check for a win after a move
+        self.cell_lines = [[line for line in self.lines if line >> cell & 1]
+                           for cell in range(size * size)]
+
+        # Cells in order of distance from the center, tried first
+        center = (size - 1) / 2
+        self.move_order = sorted(
+            range(size * size),
+            key=lambda cell: (abs(cell // size - center)
+                              + abs(cell % size - center))
+        )
+
+        # Cells within `radius` of each cell, if moves are limited
+        if radius is None and size > 5:
+            radius = 2
+        self.neighborhoods = None
+        if radius is not None:
+            self.neighborhoods = []
+            for cell in range(size * size):
+                i, j = divmod(cell, size)
+                mask = 0
+                for ni in range(max(0, i - radius), min(size, i + radius + 1)):
+                    for nj in range(max(0, j - radius),
+                                    min(size, j + radius + 1)):
+                        mask |= self.bit((ni, nj))
+                self.neighborhoods.append(mask)
+
+        # Heuristic weight of an open line holding n stones of one player
+        self.weights = [0] + [10 ** n for n in range(1, k + 1)]
+
+        # Maps (stones to move, other stones) to (depth, value, kind, move)
+        self.transposition_table = {}
+
+        # Positions visited by the last call to best_move
+        self.nodes = 0
+        self.deadline = None
+
+    def bit(self, action):
+        """
+        Returns the bit of cell (i, j).
+        """
+        i, j = action
+        return 1 << (i * self.size + j)
+
+    def from_board(self, board):
+        """
+        Returns the (x, o) bitboards of a list-of-lists board.
+        """
+        x = 0
+        o = 0
+        for i, row in enumerate(board):
+            for j, cell in enumerate(row):
+                if cell == X:
+                    x |= self.bit((i, j))
+                elif cell == O:
+                    o |= self.bit((i, j))
+        return x, o
+
+    def won(self, stones):
+        """
+        Returns True if the stones hold k in a row.
+        """
+        return any(stones & line == line for line in self.lines)
+
+    def best_move(self, board, time_limit=1.0):
+        """
+        Returns the best action (i, j) found for the player to move on a
+        list-of-lists board within `time_limit` seconds, or None if the
+        game is over.
+
+        Deepens the search one ply at a time and returns the move of the
+        deepest search that finished in time.
+        """
+        x, o = self.from_board(board)
+        if x.bit_count() == o.bit_count():
+            me, opponent = x, o
+        else:
+            me, opponent = o, x
+        empty = ~(x | o) & self.full
+        if not empty or self.won(x) or self.won(o):
+            return None
+
+        self.nodes = 0
+        self.deadline = time.perf_counter() + time_limit
+
+        # Fall back on the first candidate if not even depth 1 finishes
+        best = next(self.ordered_moves(me, opponent, empty, None))
+        for depth in range(1, empty.bit_count() + 1):
+            try:
+                value = self.negamax(me, opponent, depth, -WIN, WIN, 0)
+            except SearchTimeout:
+                break
+            best = self.transposition_table[(me, opponent)][3]
+
+            # Stop once the game is solved from here
+            if abs(value) > WIN - MAX_PLY:
+                break
+
+        return divmod(best, self.size)
+
+    def negamax(self, me, opponent, depth, alpha, beta, ply):
+        """
+        Returns the value of the position for the player to move, whose
+        stones are `me`, searching `depth` plies within (alpha, beta).
+        """
+        self.nodes += 1
+        if self.nodes % 1024 == 0 and time.perf_counter() > self.deadline:
+            raise SearchTimeout
+
+        empty = ~(me | opponent) & self.full
+        if not empty:
+            return 0
+        if depth == 0:
+            return self.evaluate(me, opponent)
+
+        # Reuse what earlier searches learned about this position
+        key = (me, opponent)
+        entry = self.transposition_table.get(key)
+        known_move = None
+        if entry is not None:
+            known_depth, value, kind, known_move = entry
+            value = from_table(value, ply)
+            if known_depth >= depth:
+                if kind == EXACT:
+                    return value
+                elif kind == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        original_alpha = alpha
+        best = -WIN
+        best_move = None
+        for move in self.ordered_moves(me, opponent, empty, known_move):
+            stones = me | 1 << move
+            if any(stones & line == line for line in self.cell_lines[move]):
+                value = WIN - (ply + 1)
+            else:
+                value = -self.negamax(opponent, stones, depth - 1,
+                                      -beta, -alpha, ply + 1)
+
+            if value > best:
+                best = value
+                best_move = move
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        if best <= original_alpha:
+            kind = UPPER
+        elif best >= beta:
+            kind = LOWER
+        else:
+            kind = EXACT
+        self.transposition_table[key] = (depth, to_table(best, ply),
+                                         kind, best_move)
+        return best
+
+    def ordered_moves(self, me, opponent, empty, known_move):
+        """
+        Yields candidate moves, the known best move first, then from the
+        center outwards, limited to cells near played stones if needed.
+        """
+        stones = me | opponent
+        if self.neighborhoods is not None and stones:
+            near = 0
+            rest = stones
+            while rest:
+                bit = rest & -rest
+                rest ^= bit
+                near |= self.neighborhoods[bit.bit_length() - 1]
+            if empty & near:
+                empty &= near
+
+        if known_move is not None and empty >> known_move & 1:
+            yield known_move
+        for move in self.move_order:
+            if move != known_move and empty >> move & 1:
+                yield move
+
+    def evaluate(self, me, opponent):
+        """
+        Scores a position for the player to move: every line still open
+        to only one player counts for that player, more so the more of
+        their stones it holds.
+        """
+        score = 0
+        weights = self.weights
+        for line in self.lines:
+            mine = me & line
+            theirs = opponent & line
+            if mine and not theirs:
+                score += weights[mine.bit_count()]
+            elif theirs and not mine:
+                score -= weights[theirs.bit_count()]
+        return score
+
+
+def to_table(value, ply):
+    """
+    Makes a win or loss score relative to the position being stored.
+    """
+    if value > WIN - MAX_PLY:
+        return value + ply
+    elif value < -WIN + MAX_PLY:
+        return value - ply
+    return value
+
+
+def from_table(value, ply):
+    """
+    Makes a stored win or loss score relative to the root again.
+    """
+    if value > WIN - MAX_PLY:
+        return value - ply
+    elif value < -WIN + MAX_PLY:
+        return value + ply
+    return value
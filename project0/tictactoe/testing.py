@@ -1,4 +1,7 @@
 from tictactoe import initial_state, player, actions, result, winner, terminal, utility, X, O, EMPTY
+import tictactoe
+import bitboard
+import book
 
 """
     PLAYER 
@@ -95,6 +98,16 @@ print("5 --", winner([[O, X, O],
                       [O, X, X],  
                       [X, O, O]]))
 
+# 6 -- Returns X for winner in middle row under an empty first row ✅
+print("6 --", winner([[EMPTY, EMPTY, EMPTY],
+                      [X,     X,     X],
+                      [O,     O,     EMPTY]]))
+
+# 7 -- Returns O for winner in last col beside an empty first col ✅
+print("7 --", winner([[EMPTY, X,     O],
+                      [EMPTY, X,     O],
+                      [EMPTY, EMPTY, O]]))
+
 
 
 print('\n')
@@ -146,4 +159,83 @@ print("2 --", utility([[O, X, O],
 # 2 -- Returns 0 if no winner ✅
 print("3 --", utility([[O, X, O], 
                       [O, X, X],  
-                      [X, O, O]]))
\ No newline at end of file
+                      [X, O, O]]))
+
+
+
+print('\n')
+
+"""
+    MINIMAX
+"""
+print("----- MINIMAX -----")
+positions = book.reachable_positions()
+searches = ["transposition", "alphabeta", "bitboard", "book"]
+
+# Solve the book in memory for the "book" search, as book.py would
+tictactoe.opening_book = book.solve()
+
+
+def optimal(search):
+    """Checks minimax picks a move keeping the value of every position."""
+    for board in positions:
+        if terminal(board):
+            continue
+        action = tictactoe.minimax(board, search)
+        if action not in actions(board) or (
+            book.value(result(board, action)) != book.value(board)
+        ):
+            return False
+    return True
+
+
+# 1 -- Returns (0, 2) for each search when X can win at once ✅
+print("1 --", [tictactoe.minimax([[X,     X,     EMPTY],
+                                  [O,     O,     EMPTY],
+                                  [EMPTY, EMPTY, EMPTY]], search)
+               for search in searches])
+
+# 2 -- Returns (0, 2) for each search when O must block ✅
+print("2 --", [tictactoe.minimax([[X,     X,     EMPTY],
+                                  [EMPTY, O,     EMPTY],
+                                  [EMPTY, EMPTY, EMPTY]], search)
+               for search in searches])
+
+# 3 -- Returns True for each search: optimal moves in all 5478 positions ✅
+print("3 --", len(positions), [optimal(search) for search in searches])
+
+# 4 -- Returns None for a finished board ✅
+print("4 --", tictactoe.minimax([[O, X, O],
+                                 [O, X, X],
+                                 [X, O, O]]))
+
+
+
+print('\n')
+
+"""
+    BITBOARD
+"""
+print("----- BITBOARD -----")
+
+# 1 -- Round-trips every reachable board through from_board/to_board ✅
+print("1 --", all(bitboard.to_board(bitboard.from_board(board)) == board
+                  for board in positions))
+
+# 2 -- Agrees with winner and player on every reachable board ✅
+print("2 --", all(bitboard.winner(bitboard.from_board(board)) == winner(board)
+                  and bitboard.player(bitboard.from_board(board))
+                  == player(board)
+                  for board in positions))
+
+
+
+print('\n')
+
+"""
+    BOOK
+"""
+print("----- BOOK -----")
+
+# 1 -- Returns [] when verifying a freshly solved book ✅
+print("1 --", book.verify(book.solve()))
@@ -3,13 +3,55 @@ Tic Tac Toe Player
 """
 
 import math
-from copy import deepcopy
+import os
+
+import bitboard
 
 X = "X"
 O = "O"
 EMPTY = None
 SIZE = 3
 
+# Whether boards that are rotations or reflections of each other
+# share an entry in the transposition table
+USE_SYMMETRY = True
+
+# Index permutations of the flattened board for the 8 board symmetries
+SYMMETRIES = [
+    (0, 1, 2, 3, 4, 5, 6, 7, 8),  # identity
+    (6, 3, 0, 7, 4, 1, 8, 5, 2),  # rotate 90
+    (8, 7, 6, 5, 4, 3, 2, 1, 0),  # rotate 180
+    (2, 5, 8, 1, 4, 7, 0, 3, 6),  # rotate 270
+    (2, 1, 0, 5, 4, 3, 8, 7, 6),  # mirror left-right
+    (6, 7, 8, 3, 4, 5, 0, 1, 2),  # mirror top-bottom
+    (0, 3, 6, 1, 4, 7, 2, 5, 8),  # mirror main diagonal
+    (8, 5, 2, 7, 4, 1, 6, 3, 0),  # mirror anti-diagonal
+]
+
+# Maps board keys to their minimax value, so each position is solved once
+transposition_table = {}
+
+# Search used by minimax: "transposition", "alphabeta", "bitboard" or "book"
+SEARCH = "transposition"
+
+# Order in which alpha-beta tries moves: center, then corners, then edges
+MOVE_ORDER = [(1, 1),
+              (0, 0), (0, 2), (2, 0), (2, 2),
+              (0, 1), (1, 0), (1, 2), (2, 1)]
+
+# Number of positions visited by the searches, to compare their cost
+nodes_visited = 0
+
+# Perfect-play table written by book.py: one byte per board, indexed by
+# reading the board as a base-3 number (EMPTY 0, X 1, O 2)
+BOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+
+# Book entry of a board that is not reachable from the initial state
+BOOK_UNKNOWN = 255
+
+# First bytes of a book file, changed whenever its layout changes
+BOOK_MAGIC = b"TTTBOOK1"
+
 
 def initial_state():
     """
@@ -68,7 +110,7 @@ def result(board, action):
             raise ValueError("Invalid action type")
 
     symbol = player(board) 
-    copy = deepcopy(board) # create a deep copy of the list so that the original is not affected
+    copy = [row.copy() for row in board] # copy each row so that the original is not affected
 
     row = action[0]
     col = action[1]
@@ -91,7 +133,8 @@ def winner(board):
     for row in board:
         symbol = row[0]
 
-        is_winner = True
+        # A row of empty cells has no winner
+        is_winner = symbol is not EMPTY
         for cell in row:
             if cell != symbol:
                 is_winner = False
@@ -103,7 +146,8 @@ def winner(board):
     for j in range(SIZE):
         symbol = board[0][j]
 
-        is_winner = True
+        # A column of empty cells has no winner
+        is_winner = symbol is not EMPTY
         for i in range(SIZE):
             if board[i][j] != symbol:
                 is_winner = False
@@ -114,12 +158,12 @@ def winner(board):
     # check for winner in diagonals
     ### From top-left:
     symbol = board[0][0]
-    if (board[1][1] == symbol and board[2][2] == symbol):
+    if (symbol is not EMPTY and board[1][1] == symbol and board[2][2] == symbol):
         return symbol
     
     ### From top-right
     symbol = board[0][2]
-    if(board[1][1] == symbol and board[2][0] == symbol):
+    if(symbol is not EMPTY and board[1][1] == symbol and board[2][0] == symbol):
         return symbol
 
     return None
@@ -159,14 +203,25 @@ def utility(board):
     raise NotImplementedError
 
 
-def minimax(board):
+def minimax(board, search=None):
     """
     Returns the optimal action for the current player on the board.
+
+    `search` selects the search algorithm, defaulting to SEARCH.
     """
     # If terminal board, then no action to take
     if terminal(board):
         return None
 
+    if (search or SEARCH) == "alphabeta":
+        return alpha_beta(board)
+    elif (search or SEARCH) == "bitboard":
+        return bitboard.minimax(bitboard.from_board(board))
+    elif (search or SEARCH) == "book" and opening_book is not None:
+        action, value = book_lookup(board)
+        if action is not None:
+            return action
+
     # initialize variables
     player_type = 'max' if player(board) == X else 'min' # define the type of player (min or max)
     best_action = None # keep track of the best action to take while we consider
@@ -174,8 +229,8 @@ def minimax(board):
 
     # If it's max player, then try to maximize the actions taken by the min player
     if (player_type == 'max'):
-        # keep track of the highest action score (start with the lowest number)
-        highest = -1
+        # keep track of the highest action score (start below any score, so an action is always chosen)
+        highest = -math.inf
 
         # consider each action
         for action in possible_actions:
@@ -189,8 +244,8 @@ def minimax(board):
 
     # if it's min player, try to minimize the actions taken by the max player
     elif (player_type == 'min'):
-        # keep track of the lowest action score (start with the highest number)
-        lowest = 1
+        # keep track of the lowest action score (start above any score, so an action is always chosen)
+        lowest = math.inf
 
         # consider each action
         for action in possible_actions:
@@ -205,23 +260,195 @@ def minimax(board):
     return best_action
 
 
+def board_key(board):
+    """
+    Returns a hashable encoding of the board for the transposition table.
+
+    With USE_SYMMETRY, all 8 rotations and reflections of a board map to
+    the same key, since they have the same minimax value.
+    """
+    cells = "".join(cell or "." for row in board for cell in row)
+    if not USE_SYMMETRY:
+        return cells
+    return min("".join(cells[i] for i in symmetry) for symmetry in SYMMETRIES)
+
+
 def max_value(board):
+    global nodes_visited
+    nodes_visited += 1
+
+    key = board_key(board)
+    if key in transposition_table:
+        return transposition_table[key]
+
     if terminal(board):
-        return utility(board)
+        highest = utility(board)
+    else:
+        highest = -1
+        for action in actions(board):
+            highest = max(highest, min_value(result(board, action)))
+
+    transposition_table[key] = highest
+    return highest
+
+def min_value(board):
+    global nodes_visited
+    nodes_visited += 1
+
+    key = board_key(board)
+    if key in transposition_table:
+        return transposition_table[key]
+
+    if terminal(board):
+        lowest = utility(board)
+    else:
+        lowest = 1
+        for action in actions(board):
+            lowest = min(lowest, max_value(result(board, action)))
+
+    transposition_table[key] = lowest
+    return lowest
     
+
+
+def ordered_actions(board):
+    """
+    Returns the possible actions on the board, most promising first.
+    """
+    return [action for action in MOVE_ORDER if board[action[0]][action[1]] is EMPTY]
+
+
+def alpha_beta(board):
+    """
+    Returns the optimal action for the current player on the board,
+    using alpha-beta pruning instead of the transposition table.
+    """
+    best_action = None
+
+    if player(board) == X:
+        highest = -math.inf
+        alpha = -1
+        for action in ordered_actions(board):
+            v = alpha_beta_min(result(board, action), alpha, 1)
+            if v > highest:
+                best_action = action
+                highest = v
+
+            # Nothing beats a win
+            if highest == 1:
+                break
+            alpha = max(alpha, highest)
+    else:
+        lowest = math.inf
+        beta = 1
+        for action in ordered_actions(board):
+            v = alpha_beta_max(result(board, action), -1, beta)
+            if v < lowest:
+                best_action = action
+                lowest = v
+
+            # Nothing beats a win
+            if lowest == -1:
+                break
+            beta = min(beta, lowest)
+
+    return best_action
+
+
+def alpha_beta_max(board, alpha, beta):
+    """
+    Returns the value of the board for the max player, or a bound on it
+    once it falls outside the (alpha, beta) window.
+    """
+    global nodes_visited
+    nodes_visited += 1
+
+    if terminal(board):
+        return utility(board)
+
     highest = -1
-    for action in actions(board):
-        highest = max(highest, min_value(result(board, action)))
-    
+    for action in ordered_actions(board):
+        highest = max(highest, alpha_beta_min(result(board, action), alpha, beta))
+
+        # The min player will never allow this position
+        if highest >= beta:
+            return highest
+        alpha = max(alpha, highest)
+
     return highest
 
-def min_value(board):
+def alpha_beta_min(board, alpha, beta):
+    """
+    Returns the value of the board for the min player, or a bound on it
+    once it falls outside the (alpha, beta) window.
+    """
+    global nodes_visited
+    nodes_visited += 1
+
     if terminal(board):
         return utility(board)
 
     lowest = 1
-    for action in actions(board):
-        lowest = min(lowest, max_value(result(board, action)))
+    for action in ordered_actions(board):
+        lowest = min(lowest, alpha_beta_max(result(board, action), alpha, beta))
+
+        # The max player will never allow this position
+        if lowest <= alpha:
+            return lowest
+        beta = min(beta, lowest)
 
     return lowest
-    
+
+
+def book_index(board):
+    """
+    Returns the index of the board in the opening book.
+    """
+    index = 0
+    for row in board:
+        for cell in row:
+            index = index * 3 + (1 if cell == X else 2 if cell == O else 0)
+    return index
+
+
+def book_entry(action, value):
+    """
+    Packs the best action (None if terminal) and value of a board
+    into one book byte.
+    """
+    move = 0 if action is None else 1 + action[0] * SIZE + action[1]
+    return move * 3 + value + 1
+
+
+def book_lookup(board):
+    """
+    Returns the (action, value) the opening book holds for the board,
+    or (None, None) if the board is not in the book.
+    """
+    entry = opening_book[book_index(board)]
+    if entry == BOOK_UNKNOWN:
+        return None, None
+    move, value = divmod(entry, 3)
+    action = None if move == 0 else divmod(move - 1, SIZE)
+    return action, value - 1
+
+
+def load_book(path=BOOK):
+    """
+    Returns the opening book written by book.py, or None if there is
+    none, or if the file is truncated or written in another layout.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    book = data[len(BOOK_MAGIC):]
+    if (not data.startswith(BOOK_MAGIC)
+            or len(book) != 3 ** (SIZE * SIZE)):
+        return None
+    return book
+
+
+# Load the opening book at startup so minimax can answer from it
+opening_book = load_book()
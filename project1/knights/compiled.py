@@ -0,0 +1,170 @@
+"""
+Compiled evaluation of sentences of logic.py
+
+`compile_sentence` turns a sentence into a flat Python function over a
+sequence of booleans, one statement per subsentence, so a model costs
+one call rather than a walk of the tree with a dict lookup per symbol.
+
+`truth_table` evaluates a sentence in all 2^n models at once, as an
+n-symbol truth table packed into the bits of one Python int, so each
+connective is a single bitwise operation over every model.
+"""
+
+import itertools
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+from sat import operands
+
+# Most symbols to build truth tables for; each table takes 2^n bits
+TABLE_SYMBOLS = 24
+
+
+def postorder(sentence):
+    """
+    Returns the distinct subsentences of a sentence, each after its
+    operands, without recursion.
+    """
+    order = []
+    done = set()
+    stack = [sentence]
+    while stack:
+        node = stack[-1]
+        if id(node) in done:
+            stack.pop()
+            continue
+        pending = []
+        if not isinstance(node, Symbol):
+            pending = [operand for operand in operands(node)
+                       if id(operand) not in done]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+        done.add(id(node))
+        order.append(node)
+    return order
+
+
+def compile_sentence(sentence, symbols):
+    """
+    Returns a function of a sequence of booleans, the values of the
+    symbol names in `symbols` in order, that evaluates the sentence.
+    """
+    index = {name: i for i, name in enumerate(symbols)}
+    names = {}
+    lines = []
+    for node in postorder(sentence):
+        if isinstance(node, Symbol):
+            try:
+                names[id(node)] = f"v[{index[node.name]}]"
+            except KeyError:
+                raise Exception(f"variable {node.name} not in model")
+            continue
+
+        args = [names[id(operand)] for operand in operands(node)]
+        if isinstance(node, Not):
+            expression = f"not {args[0]}"
+        elif isinstance(node, And):
+            expression = " and ".join(args) if args else "True"
+        elif isinstance(node, Or):
+            expression = " or ".join(args) if args else "False"
+        elif isinstance(node, Implication):
+            expression = f"not {args[0]} or {args[1]}"
+        elif isinstance(node, Biconditional):
+            expression = f"(not {args[0]}) == (not {args[1]})"
+        else:
+            raise TypeError("must be a logical sentence")
+        names[id(node)] = f"t{len(lines)}"
+        lines.append(f"    t{len(lines)} = {expression}")
+
+    source = "\n".join(
+        ["def evaluate(v):"] + lines + [f"    return {names[id(sentence)]}"]
+    )
+    namespace = {}
+    exec(source, namespace)
+    return namespace["evaluate"]
+
+
+def symbol_columns(count):
+    """
+    Returns the truth tables of the first `count` symbols over their
+    2^count models, as in `truth_table`.
+    """
+    models = 1 << count
+    columns = []
+    for i in range(count):
+
+        # Symbol i alternates runs of 2^i false and 2^i true models:
+        # start from one false and one true run, then double the pattern
+        # until it covers every model, in time linear in its size
+        run = 1 << i
+        column = (1 << run) - 1 << run
+        width = 2 * run
+        while width < models:
+            column |= column << width
+            width *= 2
+        columns.append(column)
+    return columns
+
+
+def truth_table(sentence, symbols, columns=None):
+    """
+    Returns the truth table of a sentence over the symbol names in
+    `symbols`, as an int whose bit m is set if the sentence is true in
+    model m, the model where symbol i is true if bit i of m is set.
+
+    `columns` are the truth tables of the symbols themselves, as
+    returned by `symbol_columns`, if they are already known.
+    """
+    models = 1 << len(symbols)
+    full = (1 << models) - 1
+    if columns is None:
+        columns = symbol_columns(len(symbols))
+    columns = dict(zip(symbols, columns))
+
+    tables = {}
+    for node in postorder(sentence):
+        if isinstance(node, Symbol):
+            try:
+                tables[id(node)] = columns[node.name]
+            except KeyError:
+                raise Exception(f"variable {node.name} not in model")
+            continue
+
+        args = [tables[id(operand)] for operand in operands(node)]
+        if isinstance(node, Not):
+            table = full ^ args[0]
+        elif isinstance(node, And):
+            table = full
+            for arg in args:
+                table &= arg
+        elif isinstance(node, Or):
+            table = 0
+            for arg in args:
+                table |= arg
+        elif isinstance(node, Implication):
+            table = (full ^ args[0]) | args[1]
+        elif isinstance(node, Biconditional):
+            table = full ^ (args[0] ^ args[1])
+        else:
+            raise TypeError("must be a logical sentence")
+        tables[id(node)] = table
+    return tables[id(sentence)]
+
+
+def model_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, given every model at once
+    as a truth table, or one compiled evaluation per model if there
+    are too many symbols for a table.
+    """
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    counter_model = And(knowledge, Not(query))
+    if len(symbols) <= TABLE_SYMBOLS:
+        return truth_table(counter_model, symbols) == 0
+
+    evaluate = compile_sentence(counter_model, symbols)
+    for model in itertools.product((False, True), repeat=len(symbols)):
+        if evaluate(model):
+            return False
+    return True
@@ -0,0 +1,104 @@
+"""
+Knowledge bases that answer many entailment queries
+
+`model_check` enumerates every model of the knowledge again for each
+query. A `KnowledgeBase` keeps what it knows between queries: the set
+of its models as a truth table while it has few symbols, and always an
+incremental SAT solver holding its sentences as clauses, which answers
+queries once there are too many symbols for a table.
+"""
+
+from compiled import TABLE_SYMBOLS, truth_table
+from sat import CNF, Solver
+
+
+class KnowledgeBase():
+
+    def __init__(self, *sentences):
+        self.sentences = []
+
+        # Symbol names in the order of their bits in the truth table
+        self.symbols = []
+
+        # Truth table of the models of every sentence told, over
+        # `self.symbols`, and the truth table of each symbol, or None
+        # once there are too many symbols
+        self.models = 1
+        self.columns = []
+
+        # Clauses of the sentences told, and of the queries asked,
+        # and how many of them the solver has been given
+        self.cnf = CNF()
+        self.solver = Solver()
+        self.added = 0
+
+        for sentence in sentences:
+            self.tell(sentence)
+
+    def tell(self, sentence):
+        """
+        Adds a sentence to the knowledge base, narrowing its models.
+        """
+        self.sentences.append(sentence)
+        self.cnf.add(sentence)
+        self.add_symbols(sentence.symbols())
+        if self.models is not None:
+            self.models &= truth_table(sentence, self.symbols, self.columns)
+
+    def add_symbols(self, names):
+        """
+        Adds symbols to the truth table, in which each model of the
+        knowledge becomes a model for either value of a new symbol.
+
+        The table and each symbol's column double in place, the new
+        symbol false in the lower half of the models and true in the
+        upper half, so nothing is recomputed from the sentences.
+        """
+        for name in sorted(names - set(self.symbols)):
+            if len(self.symbols) == TABLE_SYMBOLS:
+                self.models = None
+                self.columns = None
+            if self.models is not None:
+                size = 1 << len(self.symbols)
+                self.models |= self.models << size
+                self.columns = [column | column << size
+                                for column in self.columns]
+                self.columns.append((1 << size) - 1 << size)
+            self.symbols.append(name)
+
+    def ask(self, query):
+        """
+        Checks if the knowledge base entails the query.
+        """
+        self.add_symbols(query.symbols())
+        if self.models is not None:
+            return self.models & ~truth_table(query, self.symbols,
+                                              self.columns) == 0
+
+        # Entailed if no model of the knowledge makes the query false
+        literal = self.cnf.literal(query)
+        self.sync()
+        return self.solver.solve([-literal]) is None
+
+    def ask_all(self, queries):
+        """
+        Returns the list of queries the knowledge base entails.
+        """
+        return [query for query in queries if self.ask(query)]
+
+    def satisfiable(self):
+        """
+        Checks if the knowledge base has a model at all.
+        """
+        if self.models is not None:
+            return self.models != 0
+        self.sync()
+        return self.solver.solve() is not None
+
+    def sync(self):
+        """
+        Gives the solver the clauses it does not have yet.
+        """
+        for clause in self.cnf.clauses[self.added:]:
+            self.solver.add_clause(clause)
+        self.added = len(self.cnf.clauses)
@@ -1,18 +1,167 @@
 import itertools
+import weakref
 
 
 class Sentence():
+    """
+    Sentences are immutable and hash-consed: building a sentence equal to
+    one that is still alive returns that same object, so equal subtrees
+    are shared, and each sentence computes its hash, symbols and formula
+    at most once.
+
+    The exception is `And`, whose `add` changes it in place: conjunctions
+    are never shared, and neither they nor any sentence with one among
+    its operands, however deep, cache anything, so an `add` shows in
+    every sentence built on the conjunction.
+    """
+
+    __slots__ = ("_hash", "_symbols", "_formula", "_mutable", "__weakref__")
+
+    # Maps (class, key) to the live sentence built from them
+    interned = weakref.WeakValueDictionary()
+
+    def __setattr__(self, name, value):
+        raise AttributeError("sentences are immutable")
+
+    @classmethod
+    def intern(cls, key, **fields):
+        """
+        Returns the sentence of this class with the given key, building
+        it from `fields` the first time.
+        """
+        key = (cls, key)
+        sentence = Sentence.interned.get(key)
+        if sentence is None:
+            sentence = cls.build(**fields)
+            Sentence.interned[key] = sentence
+        return sentence
+
+    @classmethod
+    def build(cls, **fields):
+        """Returns a new sentence of this class with the given fields."""
+        sentence = object.__new__(cls)
+        for name, value in fields.items():
+            object.__setattr__(sentence, name, value)
+        object.__setattr__(sentence, "_hash", None)
+        object.__setattr__(sentence, "_symbols", None)
+        object.__setattr__(sentence, "_formula", None)
+        mutable = isinstance(sentence, And) or any(
+            operand._mutable for operand in sentence.operands()
+        )
+        object.__setattr__(sentence, "_mutable", mutable)
+        return sentence
+
+    def fill(self, field, compute):
+        """
+        Sets `field` of each subsentence that has not cached it to
+        `compute(node)`, operands first, and returns the value for this
+        sentence. The values stay cached only on sentences that cannot
+        change, with no `And` among them.
+        """
+        order = self.uncached(field)
+        try:
+            for node in order:
+                object.__setattr__(node, field, compute(node))
+            return getattr(self, field)
+        finally:
+            for node in order:
+                if node._mutable:
+                    object.__setattr__(node, field, None)
+
+    def __hash__(self):
+        if self._hash is None:
+            return self.fill("_hash", lambda node: node.compute_hash())
+        return self._hash
+
+    def compute_hash(self):
+        return object.__hash__(self)
 
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
 
+    def evaluate_partial(self, model):
+        """
+        Evaluates the logical sentence in a model that may leave symbols
+        unassigned: returns True or False if every completion of the model
+        agrees on it, or None if that is not known.
+        """
+        raise Exception("nothing to evaluate")
+
     def formula(self):
         """Returns string formula representing logical sentence."""
-        return ""
+        if self._formula is None:
+
+            # Write out the parts of each sentence in turn, with a stack
+            # instead of recursion, so deep sentences take linear time
+            pieces = []
+            stack = [self]
+            while stack:
+                part = stack.pop()
+                if isinstance(part, str):
+                    pieces.append(part)
+                elif part._formula is not None:
+                    pieces.append(part._formula)
+                else:
+                    stack.extend(reversed(part.formula_parts()))
+            if self._mutable:
+                return "".join(pieces)
+            object.__setattr__(self, "_formula", "".join(pieces))
+        return self._formula
+
+    def formula_parts(self):
+        """
+        Returns the formula as a list of strings and of operands, whose
+        formulas go in their place.
+        """
+        return []
+
+    def wrapped(self):
+        """
+        Returns the parts of the formula of the sentence as an operand:
+        parenthesized unless it is a single symbol or already
+        parenthesized.
+        """
+        if self.atomic():
+            return [self]
+        return ["(", self, ")"]
+
+    def atomic(self):
+        """Checks if the formula needs no parentheses as an operand."""
+        return False
+
+    def operands(self):
+        """Returns the list of operands of the logical sentence."""
+        return []
+
+    def uncached(self, field):
+        """
+        Returns the subsentences whose cached `field` is not set, each
+        after its operands, so caches can be filled in that order
+        without recursion.
+        """
+        order = []
+        seen = set()
+        stack = [(self, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if expanded:
+                order.append(node)
+            elif id(node) not in seen and getattr(node, field) is None:
+                seen.add(id(node))
+                stack.append((node, True))
+                stack.extend((operand, False) for operand in node.operands())
+        return order
 
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
+        if self._symbols is None:
+            return set(self.fill(
+                "_symbols", lambda node: frozenset(node.compute_symbols())
+            ))
+        return set(self._symbols)
+
+    def compute_symbols(self):
         return set()
 
     @classmethod
@@ -43,14 +192,23 @@ class Sentence():
 
 
 class Symbol(Sentence):
+    __slots__ = ("name",)
+
+    def __new__(cls, name):
+        return cls.intern(name, name=name)
 
-    def __init__(self, name):
-        self.name = name
+    def __reduce__(self):
+        return (type(self), (self.name,))
 
     def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+        return self is other or (
+            isinstance(other, Symbol) and self.name == other.name
+        )
 
     def __hash__(self):
+        return Sentence.__hash__(self)
+
+    def compute_hash(self):
         return hash(("symbol", self.name))
 
     def __repr__(self):
@@ -62,22 +220,45 @@ class Symbol(Sentence):
         except KeyError:
             raise Exception(f"variable {self.name} not in model")
 
+    def evaluate_partial(self, model):
+        value = model.get(self.name)
+        return None if value is None else bool(value)
+
     def formula(self):
         return self.name
 
+    def formula_parts(self):
+        return [self.name]
+
+    def atomic(self):
+        return Sentence.parenthesize(self.name) == self.name
+
     def symbols(self):
         return {self.name}
 
+    def compute_symbols(self):
+        return {self.name}
+
 
 class Not(Sentence):
-    def __init__(self, operand):
+    __slots__ = ("operand",)
+
+    def __new__(cls, operand):
         Sentence.validate(operand)
-        self.operand = operand
+        return cls.intern(id(operand), operand=operand)
+
+    def __reduce__(self):
+        return (type(self), (self.operand,))
 
     def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+        return self is other or (
+            isinstance(other, Not) and self.operand == other.operand
+        )
 
     def __hash__(self):
+        return Sentence.__hash__(self)
+
+    def compute_hash(self):
         return hash(("not", hash(self.operand)))
 
     def __repr__(self):
@@ -86,23 +267,40 @@ class Not(Sentence):
     def evaluate(self, model):
         return not self.operand.evaluate(model)
 
-    def formula(self):
-        return "¬" + Sentence.parenthesize(self.operand.formula())
+    def evaluate_partial(self, model):
+        value = self.operand.evaluate_partial(model)
+        return None if value is None else not value
 
-    def symbols(self):
+    def formula_parts(self):
+        return ["¬"] + self.operand.wrapped()
+
+    def operands(self):
+        return [self.operand]
+
+    def compute_symbols(self):
         return self.operand.symbols()
 
 
 class And(Sentence):
-    def __init__(self, *conjuncts):
+    __slots__ = ("conjuncts",)
+
+    def __new__(cls, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
-        self.conjuncts = list(conjuncts)
+        return cls.build(conjuncts=list(conjuncts))
+
+    def __reduce__(self):
+        return (type(self), tuple(self.conjuncts))
 
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        return self is other or (
+            isinstance(other, And) and self.conjuncts == other.conjuncts
+        )
 
     def __hash__(self):
+        return Sentence.__hash__(self)
+
+    def compute_hash(self):
         return hash(
             ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
         )
@@ -120,26 +318,55 @@ class And(Sentence):
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
 
-    def formula(self):
+    def evaluate_partial(self, model):
+        result = True
+        for conjunct in self.conjuncts:
+            value = conjunct.evaluate_partial(model)
+            if value is False:
+                return False
+            if value is None:
+                result = None
+        return result
+
+    def formula_parts(self):
         if len(self.conjuncts) == 1:
-            return self.conjuncts[0].formula()
-        return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
-                           for conjunct in self.conjuncts])
+            return [self.conjuncts[0]]
+        return join(" ∧ ", self.conjuncts)
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def atomic(self):
+        return len(self.conjuncts) == 0 or (
+            len(self.conjuncts) == 1 and self.conjuncts[0].atomic()
+        )
+
+    def operands(self):
+        return self.conjuncts
+
+    def compute_symbols(self):
+        return set().union(*[conjunct.symbols()
+                             for conjunct in self.conjuncts])
 
 
 class Or(Sentence):
-    def __init__(self, *disjuncts):
+    __slots__ = ("disjuncts",)
+
+    def __new__(cls, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
+        return cls.intern(tuple(map(id, disjuncts)),
+                          disjuncts=tuple(disjuncts))
+
+    def __reduce__(self):
+        return (type(self), self.disjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        return self is other or (
+            isinstance(other, Or) and self.disjuncts == other.disjuncts
+        )
 
     def __hash__(self):
+        return Sentence.__hash__(self)
+
+    def compute_hash(self):
         return hash(
             ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
         )
@@ -151,29 +378,57 @@ class Or(Sentence):
     def evaluate(self, model):
         return any(disjunct.evaluate(model) for disjunct in self.disjuncts)
 
-    def formula(self):
+    def evaluate_partial(self, model):
+        result = False
+        for disjunct in self.disjuncts:
+            value = disjunct.evaluate_partial(model)
+            if value is True:
+                return True
+            if value is None:
+                result = None
+        return result
+
+    def formula_parts(self):
         if len(self.disjuncts) == 1:
-            return self.disjuncts[0].formula()
-        return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
-                            for disjunct in self.disjuncts])
+            return [self.disjuncts[0]]
+        return join(" ∨  ", self.disjuncts)
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def atomic(self):
+        return len(self.disjuncts) == 0 or (
+            len(self.disjuncts) == 1 and self.disjuncts[0].atomic()
+        )
+
+    def operands(self):
+        return list(self.disjuncts)
+
+    def compute_symbols(self):
+        return set().union(*[disjunct.symbols()
+                             for disjunct in self.disjuncts])
 
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
+    __slots__ = ("antecedent", "consequent")
+
+    def __new__(cls, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
-        self.antecedent = antecedent
-        self.consequent = consequent
+        return cls.intern((id(antecedent), id(consequent)),
+                          antecedent=antecedent, consequent=consequent)
+
+    def __reduce__(self):
+        return (type(self), (self.antecedent, self.consequent))
 
     def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return self is other or (
+            isinstance(other, Implication)
+            and self.antecedent == other.antecedent
+            and self.consequent == other.consequent
+        )
 
     def __hash__(self):
+        return Sentence.__hash__(self)
+
+    def compute_hash(self):
         return hash(("implies", hash(self.antecedent), hash(self.consequent)))
 
     def __repr__(self):
@@ -183,53 +438,127 @@ class Implication(Sentence):
         return ((not self.antecedent.evaluate(model))
                 or self.consequent.evaluate(model))
 
-    def formula(self):
-        antecedent = Sentence.parenthesize(self.antecedent.formula())
-        consequent = Sentence.parenthesize(self.consequent.formula())
-        return f"{antecedent} => {consequent}"
+    def evaluate_partial(self, model):
+        antecedent = self.antecedent.evaluate_partial(model)
+        if antecedent is False:
+            return True
+        consequent = self.consequent.evaluate_partial(model)
+        if consequent is True:
+            return True
+        if antecedent is True and consequent is False:
+            return False
+        return None
 
-    def symbols(self):
+    def formula_parts(self):
+        return (self.antecedent.wrapped() + [" => "]
+                + self.consequent.wrapped())
+
+    def operands(self):
+        return [self.antecedent, self.consequent]
+
+    def compute_symbols(self):
         return set.union(self.antecedent.symbols(), self.consequent.symbols())
 
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
+    __slots__ = ("left", "right")
+
+    def __new__(cls, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
-        self.left = left
-        self.right = right
+        return cls.intern((id(left), id(right)), left=left, right=right)
+
+    def __reduce__(self):
+        return (type(self), (self.left, self.right))
 
     def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+        return self is other or (
+            isinstance(other, Biconditional)
+            and self.left == other.left
+            and self.right == other.right
+        )
 
     def __hash__(self):
+        return Sentence.__hash__(self)
+
+    def compute_hash(self):
         return hash(("biconditional", hash(self.left), hash(self.right)))
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
 
     def evaluate(self, model):
-        return ((self.left.evaluate(model)
-                 and self.right.evaluate(model))
-                or (not self.left.evaluate(model)
-                    and not self.right.evaluate(model)))
+        return self.left.evaluate(model) == self.right.evaluate(model)
 
-    def formula(self):
-        left = Sentence.parenthesize(str(self.left))
-        right = Sentence.parenthesize(str(self.right))
-        return f"{left} <=> {right}"
+    def evaluate_partial(self, model):
+        left = self.left.evaluate_partial(model)
+        if left is None:
+            return None
+        right = self.right.evaluate_partial(model)
+        if right is None:
+            return None
+        return left == right
 
-    def symbols(self):
+    def formula_parts(self):
+        return self.left.wrapped() + [" <=> "] + self.right.wrapped()
+
+    def operands(self):
+        return [self.left, self.right]
+
+    def compute_symbols(self):
         return set.union(self.left.symbols(), self.right.symbols())
 
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+def join(separator, operands):
+    """
+    Returns the formula parts of operands joined by a connective.
+    """
+    parts = []
+    for i, operand in enumerate(operands):
+        if i:
+            parts.append(separator)
+        parts.extend(operand.wrapped())
+    return parts
+
+
+# Counts from the last call to model_check: models checked, partial or
+# complete, complete models reached, and complete models there are
+model_check_stats = {"checked": 0, "models": 0, "space": 0}
+
+
+def model_check(knowledge, query, prune=True, model=None):
+    """
+    Checks if knowledge base entails query.
+
+    If `model` assigns some symbols already, only its completions are
+    checked.
+
+    With `prune`, each partial model is checked too, in three-valued logic,
+    and its completions are skipped once the knowledge base is false or
+    the query is true in all of them, or both are known to fail.
+    """
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
+        model_check_stats["checked"] += 1
+        if not symbols:
+            model_check_stats["models"] += 1
+
+        if prune:
+
+            # Entailment holds in every completion where the knowledge
+            # base is false or the query is true
+            known = knowledge.evaluate_partial(model)
+            if known is False:
+                return True
+            entailed = query.evaluate_partial(model)
+            if entailed is True:
+                return True
+
+            # Any completion is a model of the knowledge base but not of
+            # the query
+            if known is True and entailed is False:
+                return False
 
         # If model has an assignment for each symbol
         if not symbols:
@@ -258,6 +587,9 @@ def model_check(knowledge, query):
 
     # Get all symbols in both knowledge and query
     symbols = set.union(knowledge.symbols(), query.symbols())
+    model = dict(model or {})
+    symbols.difference_update(model)
+    model_check_stats.update(checked=0, models=0, space=2 ** len(symbols))
 
     # Check that knowledge entails query
-    return check_all(knowledge, query, symbols, dict())
+    return check_all(knowledge, query, symbols, model)
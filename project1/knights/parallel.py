@@ -0,0 +1,56 @@
+import itertools
+import multiprocessing
+
+import logic
+
+# Problem inherited by forked workers, set just before the pool starts
+shared_problem = None
+
+
+def model_check(knowledge, query, processes=None, k=None, prune=True):
+    """
+    Checks if knowledge base entails query, like `logic.model_check`,
+    splitting the models across a pool of worker processes.
+
+    The first `k` symbols are fixed to each of their 2^k assignments,
+    and the models completing each assignment are checked as one task.
+    As soon as any task finds a model of the knowledge base in which
+    the query is false, the pool is terminated, stopping every worker.
+    Runs in this process if forking is not available.
+    """
+    global shared_problem
+
+    if "fork" not in multiprocessing.get_all_start_methods() or processes == 1:
+        return logic.model_check(knowledge, query, prune)
+
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    if k is None:
+
+        # Several tasks per process, so that uneven tasks balance out
+        tasks = 8 * (processes or multiprocessing.cpu_count())
+        k = tasks.bit_length()
+    fixed = symbols[:k]
+
+    shared_problem = (knowledge, query, fixed, prune)
+    context = multiprocessing.get_context("fork")
+    try:
+        with context.Pool(processes) as pool:
+            for entailed in pool.imap_unordered(
+                check_assignment,
+                itertools.product((True, False), repeat=len(fixed))
+            ):
+                if not entailed:
+                    return False
+        return True
+    finally:
+        shared_problem = None
+
+
+def check_assignment(values):
+    """
+    Checks entailment in a worker over the models that give the fixed
+    symbols `values`.
+    """
+    knowledge, query, fixed, prune = shared_problem
+    return logic.model_check(knowledge, query, prune,
+                             dict(zip(fixed, values)))
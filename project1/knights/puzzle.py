@@ -1,4 +1,5 @@
 from logic import *
+from knowledge import KnowledgeBase
 
 AKnight = Symbol("A is a Knight")
 AKnave = Symbol("A is a Knave")
@@ -77,9 +78,8 @@ def main():
         if len(knowledge.conjuncts) == 0:
             print("    Not yet implemented.")
         else:
-            for symbol in symbols:
-                if model_check(knowledge, symbol):
-                    print(f"    {symbol}")
+            for symbol in KnowledgeBase(knowledge).ask_all(symbols):
+                print(f"    {symbol}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,185 @@
+"""
+Resolution theorem proving for sentences of logic.py
+
+A knowledge base entails a query if the clauses of the knowledge base
+and of the negated query resolve to the empty clause. Resolution only
+looks at clauses that share a literal, so it decides entailment without
+enumerating models, however many symbols the knowledge base has.
+
+Clauses are frozensets of nonzero ints as in sat.py: the literal `v`
+asserts symbol number `v` and `-v` denies it.
+"""
+
+import heapq
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+from sat import Solver
+
+
+class ClauseStore():
+    """
+    Clauses kept by the prover, indexed by literal, with no clause
+    subsuming another.
+    """
+
+    def __init__(self):
+        self.clauses = {}
+        self.count = 0
+
+        # Maps each literal to the ids of the clauses containing it
+        self.index = {}
+
+    def subsumes(self, clause):
+        """
+        Checks if a kept clause is a subset of `clause`, and so makes it
+        redundant.
+        """
+        for literal in clause:
+            for i in self.index.get(literal, ()):
+                if self.clauses[i] <= clause:
+                    return True
+        return False
+
+    def add(self, clause):
+        """
+        Keeps a clause, dropping the kept clauses it subsumes, and
+        returns its id.
+        """
+        supersets = None
+        for literal in clause:
+            ids = self.index.get(literal, set())
+            supersets = set(ids) if supersets is None else supersets & ids
+            if not supersets:
+                break
+        for i in supersets or ():
+            self.remove(i)
+
+        i = self.count
+        self.count += 1
+        self.clauses[i] = clause
+        for literal in clause:
+            self.index.setdefault(literal, set()).add(i)
+        return i
+
+    def remove(self, i):
+        for literal in self.clauses.pop(i):
+            self.index[literal].discard(i)
+
+    def resolvents(self, clause):
+        """
+        Yields every clause that resolves from `clause` and a kept
+        clause, leaving out tautologies.
+        """
+        for literal in clause:
+            rest = clause - {literal}
+            for i in list(self.index.get(-literal, ())):
+                resolvent = rest | (self.clauses[i] - {-literal})
+                if not any(-other in resolvent for other in resolvent):
+                    yield resolvent
+
+
+def to_clauses(sentence, variables, positive=True):
+    """
+    Returns the list of clauses in the conjunctive normal form of the
+    sentence, or of its negation if not `positive`, numbering symbols
+    by `variables`, a dict from names to ints that grows as needed.
+
+    Disjunctions are distributed over conjunctions, so a sentence may
+    have many more clauses than connectives.
+    """
+    if isinstance(sentence, Symbol):
+        if sentence.name not in variables:
+            variables[sentence.name] = len(variables) + 1
+        v = variables[sentence.name]
+        return [frozenset([v if positive else -v])]
+
+    elif isinstance(sentence, Not):
+        return to_clauses(sentence.operand, variables, not positive)
+
+    elif isinstance(sentence, (And, Or)):
+        operands = (sentence.conjuncts if isinstance(sentence, And)
+                    else sentence.disjuncts)
+        parts = [to_clauses(operand, variables, positive)
+                 for operand in operands]
+        if isinstance(sentence, And) == positive:
+            return [clause for part in parts for clause in part]
+        return distribute(parts)
+
+    elif isinstance(sentence, Implication):
+        if positive:
+            return distribute([
+                to_clauses(sentence.antecedent, variables, False),
+                to_clauses(sentence.consequent, variables, True)
+            ])
+        return (to_clauses(sentence.antecedent, variables, True)
+                + to_clauses(sentence.consequent, variables, False))
+
+    elif isinstance(sentence, Biconditional):
+        left = sentence.left
+        right = sentence.right
+        return (
+            distribute([to_clauses(left, variables, False),
+                        to_clauses(right, variables, positive)])
+            + distribute([to_clauses(left, variables, True),
+                          to_clauses(right, variables, not positive)])
+        )
+
+    raise TypeError("must be a logical sentence")
+
+
+def distribute(parts):
+    """
+    Returns the clauses of the disjunction of several lists of clauses,
+    leaving out tautologies.
+    """
+    clauses = [frozenset()]
+    for part in parts:
+        clauses = [clause | other for clause in clauses for other in part
+                   if not any(-literal in clause for literal in other)]
+    return clauses
+
+
+def entails(knowledge, query):
+    """
+    Checks if knowledge base entails query, by resolution refutation.
+
+    Follows the set of support strategy: every resolution involves a
+    clause of the negated query or one resolved from it, tried shortest
+    first, which keeps the search on clauses relevant to the query.
+    """
+    variables = {}
+    kept = ClauseStore()
+    for clause in sorted(set(to_clauses(knowledge, variables)), key=len):
+        if not clause:
+            return True
+        if not kept.subsumes(clause):
+            kept.add(clause)
+
+    support = []
+    seen = set()
+    for clause in to_clauses(query, variables, False):
+        if clause not in seen:
+            seen.add(clause)
+            heapq.heappush(support, (len(clause), sorted(clause), clause))
+
+    while support:
+        _, _, given = heapq.heappop(support)
+        if not given:
+            return True
+        if kept.subsumes(given):
+            continue
+        for resolvent in kept.resolvents(given):
+            if not resolvent:
+                return True
+            if resolvent not in seen:
+                seen.add(resolvent)
+                heapq.heappush(support,
+                               (len(resolvent), sorted(resolvent), resolvent))
+        kept.add(given)
+
+    # The set of support only finds a refutation if the knowledge base
+    # alone is consistent; one that is not entails every query
+    solver = Solver()
+    for clause in to_clauses(knowledge, variables):
+        solver.add_clause(list(clause))
+    return solver.solve() is None
@@ -0,0 +1,425 @@
+"""
+Satisfiability checking for sentences of logic.py
+
+Sentences are compiled to conjunctive normal form with the Tseitin
+encoding, which gives every connective a variable of its own so the
+clauses grow linearly with the sentence, then solved by a DPLL search
+with unit propagation and conflict-driven clause learning.
+
+As in the DIMACS format, variables are positive ints, the literal `v`
+asserts variable `v` and `-v` denies it, and a clause is a list of
+literals of which at least one must hold.
+"""
+
+import heapq
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+
+class CNF():
+    """
+    Clauses satisfiable exactly when the sentences added to them are,
+    with a variable for each symbol and each compound subsentence.
+    """
+
+    def __init__(self):
+        self.clauses = []
+
+        # Maps symbol names to their variables, and back
+        self.variables = {}
+        self.names = {}
+        self.count = 0
+
+        # Maps id() of each encoded sentence to (literal, sentence); the
+        # sentence is kept so that its id is not reused
+        self.literals = {}
+
+    def variable(self, name):
+        """
+        Returns the variable of a symbol name, creating it if needed.
+        """
+        if name not in self.variables:
+            self.variables[name] = self.new_variable()
+            self.names[self.variables[name]] = name
+        return self.variables[name]
+
+    def new_variable(self):
+        """
+        Returns a variable not used before.
+        """
+        self.count += 1
+        return self.count
+
+    def add(self, sentence):
+        """
+        Adds clauses that hold only if the sentence is true.
+        """
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.clauses.append([self.literal(disjunct)
+                                 for disjunct in sentence.disjuncts])
+        else:
+            self.clauses.append([self.literal(sentence)])
+
+    def literal(self, sentence):
+        """
+        Returns a literal that is true in a model of the clauses exactly
+        when the sentence is, encoding the sentence if needed.
+
+        Subsentences are encoded children first with an explicit stack,
+        so deep sentences do not hit the recursion limit.
+        """
+        stack = [sentence]
+        while stack:
+            node = stack[-1]
+            if id(node) in self.literals:
+                stack.pop()
+                continue
+            if isinstance(node, Symbol):
+                stack.pop()
+                self.literals[id(node)] = (self.variable(node.name), node)
+                continue
+            pending = [operand for operand in operands(node)
+                       if id(operand) not in self.literals]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            self.literals[id(node)] = (self.encode(node), node)
+        return self.literals[id(sentence)][0]
+
+    def encode(self, sentence):
+        """
+        Returns the literal of a compound sentence whose operands are
+        already encoded, adding the clauses that define it.
+        """
+        children = [self.literals[id(operand)][0]
+                    for operand in operands(sentence)]
+        if isinstance(sentence, Not):
+            return -children[0]
+
+        v = self.new_variable()
+        clauses = self.clauses
+        if isinstance(sentence, And):
+            for child in children:
+                clauses.append([-v, child])
+            clauses.append([v] + [-child for child in children])
+        elif isinstance(sentence, Or):
+            for child in children:
+                clauses.append([v, -child])
+            clauses.append([-v] + children)
+        elif isinstance(sentence, Implication):
+            a, b = children
+            clauses.extend([[-v, -a, b], [v, a], [v, -b]])
+        else:
+            a, b = children
+            clauses.extend([[-v, -a, b], [-v, a, -b],
+                            [v, a, b], [v, -a, -b]])
+        return v
+
+
+class Solver():
+    """
+    Incremental CDCL solver: clauses can be added between calls to
+    `solve`, and clauses learned in one call are kept for the next.
+    """
+
+    def __init__(self):
+        self.ok = True
+        self.clauses = []
+
+        # Maps each literal to the clauses watching it; the first two
+        # literals of a clause are watched
+        self.watches = {}
+
+        # Current assignment, and the decision level and implying clause
+        # of each assigned variable, in order of assignment on the trail
+        self.values = {}
+        self.levels = {}
+        self.reasons = {}
+        self.trail = []
+        self.trail_limits = []
+        self.head = 0
+
+        # Variables are decided by activity, bumped in every conflict
+        # they take part in, and set to the value they had last
+        self.activity = {}
+        self.increment = 1.0
+        self.order = []
+        self.phases = {}
+
+        # Search statistics
+        self.conflicts = 0
+        self.decisions = 0
+
+    def value(self, literal):
+        """
+        Returns True or False if the literal is assigned, else None.
+        """
+        value = self.values.get(abs(literal))
+        if value is None:
+            return None
+        return value == (literal > 0)
+
+    def add_variable(self, var):
+        if var not in self.activity:
+            self.activity[var] = 0.0
+            heapq.heappush(self.order, (0.0, var))
+
+    def add_clause(self, clause):
+        """
+        Adds a clause to the problem.
+        """
+        self.backtrack(0)
+        if not self.ok:
+            return
+        literals = set()
+        for literal in clause:
+            if -literal in literals:
+                return
+            self.add_variable(abs(literal))
+            value = self.value(literal)
+            if value is True:
+                return
+            if value is None:
+                literals.add(literal)
+
+        clause = list(literals)
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self.assign(clause[0], None)
+            if self.propagate() is not None:
+                self.ok = False
+        else:
+            self.watch(clause)
+
+    def watch(self, clause):
+        self.clauses.append(clause)
+        self.watches.setdefault(clause[0], []).append(clause)
+        self.watches.setdefault(clause[1], []).append(clause)
+
+    def assign(self, literal, reason):
+        var = abs(literal)
+        self.values[var] = literal > 0
+        self.levels[var] = len(self.trail_limits)
+        self.reasons[var] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Assigns every literal forced by a clause with one unassigned
+        literal left, and returns a clause left false, if any.
+        """
+        while self.head < len(self.trail):
+            false = -self.trail[self.head]
+            self.head += 1
+            watching = self.watches.get(false, [])
+            kept = []
+            for i, clause in enumerate(watching):
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], false
+                first = clause[0]
+                if self.value(first) is True:
+                    kept.append(clause)
+                    continue
+
+                # Watch another literal that is not false, if there is one
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], false
+                        self.watches.setdefault(clause[1], []).append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if self.value(first) is False:
+                        kept.extend(watching[i + 1:])
+                        self.watches[false] = kept
+                        return clause
+                    self.assign(first, clause)
+            self.watches[false] = kept
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns the clause learned from a conflict, cut at the first
+        unique implication point, and the level to backjump to.
+        """
+        level = len(self.trail_limits)
+        learned = [None]
+        seen = set()
+        pending = 0
+        index = len(self.trail) - 1
+        clause = conflict
+        while True:
+            for literal in clause:
+                var = abs(literal)
+                if var in seen or self.levels[var] == 0:
+                    continue
+                seen.add(var)
+                self.bump(var)
+                if self.levels[var] == level:
+                    pending += 1
+                else:
+                    learned.append(literal)
+
+            # Resolve on the latest assignment in the conflict
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.reasons[abs(literal)]
+        learned[0] = -literal
+
+        # Watch the literal assigned latest besides the asserting one
+        backjump = 0
+        for i in range(1, len(learned)):
+            if self.levels[abs(learned[i])] > backjump:
+                backjump = self.levels[abs(learned[i])]
+                learned[1], learned[i] = learned[i], learned[1]
+        return learned, backjump
+
+    def bump(self, var):
+        self.activity[var] += self.increment
+        if self.activity[var] > 1e100:
+            for v in self.activity:
+                self.activity[v] *= 1e-100
+            self.increment *= 1e-100
+            self.order = [(-self.activity[v], v) for v in self.activity
+                          if v not in self.values]
+            heapq.heapify(self.order)
+        elif var not in self.values:
+            heapq.heappush(self.order, (-self.activity[var], var))
+
+    def backtrack(self, level):
+        """
+        Undoes every assignment made above a decision level.
+        """
+        if len(self.trail_limits) <= level:
+            return
+        start = self.trail_limits[level]
+        for literal in self.trail[start:]:
+            var = abs(literal)
+            self.phases[var] = literal > 0
+            del self.values[var]
+            heapq.heappush(self.order, (-self.activity[var], var))
+        del self.trail[start:]
+        del self.trail_limits[level:]
+        self.head = start
+
+    def decide(self):
+        """
+        Returns the unassigned variable of highest activity, or None.
+        """
+        while self.order:
+            _, var = heapq.heappop(self.order)
+            if var not in self.values:
+                return var
+        return None
+
+    def solve(self, assumptions=()):
+        """
+        Returns a model of the clauses in which every literal in
+        `assumptions` holds, as a dict from variables to booleans,
+        or None if there is none.
+        """
+        if not self.ok:
+            return None
+        self.backtrack(0)
+        for literal in assumptions:
+            self.add_variable(abs(literal))
+
+        restart = 100
+        conflicts = 0
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                conflicts += 1
+                if not self.trail_limits:
+                    self.ok = False
+                    return None
+                learned, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.watch(learned)
+                    self.assign(learned[0], learned)
+                self.increment /= 0.95
+                continue
+
+            # Restart now and then, keeping what was learned
+            if conflicts >= restart:
+                conflicts = 0
+                restart = int(restart * 1.5)
+                self.backtrack(0)
+                continue
+
+            level = len(self.trail_limits)
+            if level < len(assumptions):
+                literal = assumptions[level]
+                value = self.value(literal)
+                if value is False:
+                    self.backtrack(0)
+                    return None
+                self.trail_limits.append(len(self.trail))
+                if value is None:
+                    self.assign(literal, None)
+                continue
+
+            var = self.decide()
+            if var is None:
+                model = dict(self.values)
+                self.backtrack(0)
+                return model
+            self.decisions += 1
+            self.trail_limits.append(len(self.trail))
+            self.assign(var if self.phases.get(var, False) else -var, None)
+
+
+def operands(sentence):
+    """
+    Returns the list of operands of a compound sentence.
+    """
+    if isinstance(sentence, Not):
+        return [sentence.operand]
+    elif isinstance(sentence, And):
+        return sentence.conjuncts
+    elif isinstance(sentence, Or):
+        return sentence.disjuncts
+    elif isinstance(sentence, Implication):
+        return [sentence.antecedent, sentence.consequent]
+    elif isinstance(sentence, Biconditional):
+        return [sentence.left, sentence.right]
+    raise TypeError("must be a logical sentence")
+
+
+def satisfiable(sentence):
+    """
+    Returns a model of the sentence as a dict from symbol names to
+    booleans, or None if the sentence is unsatisfiable.
+    """
+    cnf = CNF()
+    cnf.add(sentence)
+    solver = Solver()
+    for clause in cnf.clauses:
+        solver.add_clause(clause)
+    model = solver.solve()
+    if model is None:
+        return None
+    return {name: model.get(var, False)
+            for name, var in cnf.variables.items()}
+
+
+def model_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, by checking that the
+    knowledge base and the negation of the query are unsatisfiable.
+    """
+    return satisfiable(And(knowledge, Not(query))) is None
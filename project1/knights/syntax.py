@@ -0,0 +1,168 @@
+"""
+Reading sentences of logic.py from text
+
+`parse` reads the syntax written by `Sentence.formula`, and `load_dimacs`
+reads knowledge bases in conjunctive normal form from DIMACS CNF files.
+Both work without recursion, so they handle sentences of any depth.
+"""
+
+import re
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+# Binding strength of each binary connective, and the sentence it builds
+CONNECTIVES = {
+    "∧": (4, And),
+    "∨": (3, Or),
+    "=>": (2, Implication),
+    "<=>": (1, Biconditional),
+}
+
+# Connectives that chain into a single n-ary sentence
+CHAINS = {"∧", "∨"}
+
+TOKENS = re.compile(r"(<=>|=>|[()¬∧∨])")
+
+
+def tokenize(text):
+    """
+    Yields the connectives, parentheses and symbol names of a formula.
+    Symbol names are whatever text lies between the others, stripped.
+    """
+    for i, token in enumerate(TOKENS.split(text)):
+        if i % 2:
+            yield token
+        else:
+            token = token.strip()
+            if token:
+                yield Symbol(token)
+
+
+def parse(text):
+    """
+    Returns the sentence of a formula such as `Sentence.formula` writes.
+
+    ¬ binds tightest, then ∧, ∨, => and <=>, so that `¬a ∧ b ∨ c => d`
+    reads as `(((¬a) ∧ b) ∨ c) => d`; => and <=> group to the right, and
+    unparenthesized chains of ∧ or ∨ make a single And or Or.
+    """
+    # Operands are sentences, or lists [connective, operand, ...] of
+    # chains that may still grow
+    operands = []
+    operators = []
+    expect_operand = True
+    for token in tokenize(text):
+        if expect_operand:
+            if isinstance(token, Symbol):
+                operands.append(token)
+                expect_operand = False
+            elif token in ("(", "¬"):
+                operators.append(token)
+            else:
+                raise ValueError(f"expected a sentence before {token!r}")
+
+        elif token == ")":
+            while operators and operators[-1] != "(":
+                reduce(operands, operators.pop())
+            if not operators:
+                raise ValueError("unbalanced parentheses")
+            operators.pop()
+            operands[-1] = complete(operands[-1])
+
+        elif token in CONNECTIVES:
+            strength = CONNECTIVES[token][0]
+            while operators and operators[-1] != "(" and (
+                operators[-1] == "¬"
+                or CONNECTIVES[operators[-1]][0] > strength
+                or (operators[-1] == token and token in CHAINS)
+            ):
+                reduce(operands, operators.pop())
+            operators.append(token)
+            expect_operand = True
+
+        else:
+            raise ValueError(f"expected a connective before {token!r}")
+
+    if expect_operand:
+        raise ValueError("incomplete formula")
+    while operators:
+        operator = operators.pop()
+        if operator == "(":
+            raise ValueError("unbalanced parentheses")
+        reduce(operands, operator)
+    return complete(operands.pop())
+
+
+def reduce(operands, operator):
+    """
+    Applies an operator to the operands on top of the stack.
+    """
+    right = complete(operands.pop())
+    if operator == "¬":
+        operands.append(Not(right))
+        return
+    left = operands.pop()
+    if operator in CHAINS:
+        if isinstance(left, list) and left[0] == operator:
+            left.append(right)
+        else:
+            left = [operator, complete(left), right]
+        operands.append(left)
+    else:
+        operands.append(CONNECTIVES[operator][1](complete(left), right))
+
+
+def complete(operand):
+    """
+    Returns the sentence of an operand, building it if it is a chain.
+    """
+    if isinstance(operand, list):
+        return CONNECTIVES[operand[0]][1](*operand[1:])
+    return operand
+
+
+def parse_dimacs(lines, names=None):
+    """
+    Returns the conjunction of one disjunction per clause of a DIMACS
+    CNF file, given as an iterable of lines.
+
+    Variable `v` becomes the symbol named `names[v]`, if `names` is
+    given, or `str(v)`.
+    """
+    symbols = {}
+    clauses = []
+    clause = []
+    for line in lines:
+        line = line.strip()
+        if line.startswith("%"):
+            break
+        if not line or line.startswith("c"):
+            continue
+        if line.startswith("p"):
+            header = line.split()
+            if len(header) != 4 or header[1] != "cnf":
+                raise ValueError(f"not a DIMACS CNF header: {line!r}")
+            continue
+
+        for token in line.split():
+            literal = int(token)
+            if literal == 0:
+                clauses.append(Or(*clause))
+                clause = []
+                continue
+            v = abs(literal)
+            if v not in symbols:
+                symbols[v] = Symbol(names[v] if names else str(v))
+            clause.append(symbols[v] if literal > 0 else Not(symbols[v]))
+
+    if clause:
+        clauses.append(Or(*clause))
+    return And(*clauses)
+
+
+def load_dimacs(path, names=None):
+    """
+    Returns the conjunction of the clauses of a DIMACS CNF file.
+    """
+    with open(path) as f:
+        return parse_dimacs(f, names)
@@ -0,0 +1,312 @@
+import itertools
+import random
+
+import compiled
+import knowledge
+import logic
+import parallel
+import resolution
+import sat
+import syntax
+from puzzle import (knowledge0, knowledge1, knowledge2, knowledge3,
+                    AKnight, AKnave, BKnight, BKnave, CKnight, CKnave)
+
+rng = random.Random(0)
+puzzles = [knowledge0, knowledge1, knowledge2, knowledge3]
+symbols = [AKnight, AKnave, BKnight, BKnave, CKnight, CKnave]
+
+
+def random_3sat(variables, clauses):
+    return [[rng.choice([v, -v]) for v in rng.sample(range(1, variables + 1), 3)]
+            for _ in range(clauses)]
+
+
+def brute_force(variables, clauses, assumptions=()):
+    for values in itertools.product((False, True), repeat=variables):
+        holds = lambda literal: values[abs(literal) - 1] == (literal > 0)
+        if (all(holds(literal) for literal in assumptions)
+                and all(any(holds(literal) for literal in clause)
+                        for clause in clauses)):
+            return True
+    return False
+
+
+def solve(clauses, assumptions=()):
+    solver = sat.Solver()
+    for clause in clauses:
+        solver.add_clause(clause)
+    return solver.solve(assumptions)
+
+
+def random_sentence(depth):
+    if depth == 0 or rng.random() < 0.2:
+        return logic.Symbol(rng.choice("PQRS"))
+    kind = rng.choice([logic.Not, logic.And, logic.Or,
+                       logic.Implication, logic.Biconditional])
+    if kind is logic.Not:
+        return logic.Not(random_sentence(depth - 1))
+    return kind(random_sentence(depth - 1), random_sentence(depth - 1))
+
+
+def satisfies(model, clauses, assumptions=()):
+    holds = lambda literal: model.get(abs(literal), False) == (literal > 0)
+    return (all(holds(literal) for literal in assumptions)
+            and all(any(holds(literal) for literal in clause)
+                    for clause in clauses))
+
+
+"""
+    SOLVER
+"""
+print("----- SOLVER -----")
+# 1 -- agrees with brute force on 200 random 3-SAT problems near the threshold ✅
+problems = [random_3sat(8, rng.randint(25, 45)) for _ in range(200)]
+print("1 --", all((solve(clauses) is not None) == brute_force(8, clauses)
+                  for clauses in problems))
+
+# 2 -- returns models that satisfy every clause ✅
+print("2 --", all(satisfies(model, clauses) for clauses in problems
+                  for model in [solve(clauses)] if model is not None))
+
+# 3 -- agrees with brute force under random assumptions ✅
+cases = [(clauses, [rng.choice([v, -v]) for v in rng.sample(range(1, 9), 3)])
+         for clauses in problems]
+print("3 --", all((solve(clauses, assumptions) is not None)
+                  == brute_force(8, clauses, assumptions)
+                  for clauses, assumptions in cases))
+
+# 4 -- returns models that satisfy the assumptions too ✅
+print("4 --", all(satisfies(model, clauses, assumptions)
+                  for clauses, assumptions in cases
+                  for model in [solve(clauses, assumptions)]
+                  if model is not None))
+
+# 5 -- returns None, a model, None, a model from one solver as assumptions change ✅
+solver = sat.Solver()
+for clause in [[1, 2], [-1, 2], [-2, 3]]:
+    solver.add_clause(clause)
+print("5 --", solver.solve([-3]), solver.solve([1]) is not None,
+      solver.solve([-2]), solver.solve() is not None)
+
+# 6 -- returns None for an empty clause ✅
+print("6 --", solve([[1], []]))
+print('\n')
+
+
+"""
+    MODEL CHECK
+"""
+print("----- MODEL CHECK -----")
+# 1 -- agrees with logic.model_check on every puzzle and symbol ✅
+print("1 --", all(sat.model_check(knowledge, symbol)
+                  == logic.model_check(knowledge, symbol)
+                  for knowledge in puzzles for symbol in symbols))
+
+# 2 -- agrees with logic.model_check on negated symbols ✅
+print("2 --", all(sat.model_check(knowledge, logic.Not(symbol))
+                  == logic.model_check(knowledge, logic.Not(symbol))
+                  for knowledge in puzzles for symbol in symbols))
+
+# 3 -- returns a model of each puzzle's knowledge ✅
+print("3 --", all(knowledge.evaluate(sat.satisfiable(knowledge))
+                  for knowledge in puzzles))
+
+# 4 -- compiled.model_check agrees with logic.model_check on every puzzle ✅
+print("4 --", all(compiled.model_check(knowledge, symbol)
+                  == logic.model_check(knowledge, symbol)
+                  for knowledge in puzzles for symbol in symbols))
+print('\n')
+
+
+"""
+    SENTENCES
+"""
+print("----- SENTENCES -----")
+A, B, C = logic.Symbol("A"), logic.Symbol("B"), logic.Symbol("C")
+
+# 1 -- returns the same object for equal sentences ✅
+print("1 --", logic.Or(A, logic.Not(B)) is logic.Or(A, logic.Not(B)))
+
+# 2 -- shows an add to a nested And in symbols and formula ✅
+inner = logic.And(A)
+outer = logic.And(inner, B)
+negated = logic.Not(outer)
+before = (sorted(outer.symbols()), outer.formula(), negated.formula(),
+          hash(outer))
+inner.add(C)
+print("2 --", before[:3], sorted(outer.symbols()), outer.formula(),
+      negated.formula())
+
+# 3 -- changes the hash of the outer And after the add ✅
+print("3 --", hash(outer) != before[3])
+
+# 4 -- finds that the outer And entails C after the add, with every backend ✅
+print("4 --", compiled.model_check(outer, C), sat.model_check(outer, C),
+      logic.model_check(outer, C))
+print('\n')
+
+
+"""
+    RESOLUTION
+"""
+print("----- RESOLUTION -----")
+# 1 -- agrees with logic.model_check on every puzzle and symbol ✅
+print("1 --", all(resolution.entails(knowledge, symbol)
+                  == logic.model_check(knowledge, symbol)
+                  for knowledge in puzzles for symbol in symbols))
+
+# 2 -- agrees with logic.model_check on 300 random sentences ✅
+pairs = [(random_sentence(4), random_sentence(3)) for _ in range(300)]
+print("2 --", all(resolution.entails(knowledge, query)
+                  == logic.model_check(knowledge, query)
+                  for knowledge, query in pairs))
+
+# 3 -- returns True for an inconsistent knowledge base ✅
+P, Q = logic.Symbol("P"), logic.Symbol("Q")
+print("3 --", resolution.entails(logic.And(P, logic.Not(P)), Q))
+
+# 4 -- returns True for a tautology and False for a non-entailed symbol ✅
+print("4 --", resolution.entails(P, logic.Or(Q, logic.Not(Q))),
+      resolution.entails(P, Q))
+print('\n')
+
+
+"""
+    SYNTAX
+"""
+print("----- SYNTAX -----")
+# 1 -- reads back 300 random sentences from their formulas ✅
+sentences = [random_sentence(5) for _ in range(300)]
+print("1 --", all(syntax.parse(sentence.formula()) == sentence
+                  for sentence in sentences))
+
+# 2 -- reads back every puzzle from its formula ✅
+print("2 --", all(syntax.parse(knowledge.formula()) == knowledge
+                  for knowledge in puzzles))
+
+# 3 -- reads chains as one And or Or, ¬ tightest, => grouping right ✅
+print("3 --", syntax.parse("¬P ∧ Q ∧ R ∨ S => P => Q")
+      == logic.Implication(
+          logic.Or(logic.And(logic.Not(P), Q, logic.Symbol("R")),
+                   logic.Symbol("S")),
+          logic.Implication(P, Q)))
+
+# 4 -- reads back 100 random DIMACS problems with the same models ✅
+dimacs = [random_3sat(6, rng.randint(10, 30)) for _ in range(100)]
+print("4 --", all(
+    (sat.satisfiable(syntax.parse_dimacs(
+        ["p cnf 6 %d" % len(clauses)]
+        + [" ".join(map(str, clause)) + " 0" for clause in clauses]
+    )) is not None) == brute_force(6, clauses)
+    for clauses in dimacs
+))
+
+# 5 -- reads back a sentence nested 10000 deep ✅
+deep = P
+for i in range(10000):
+    deep = logic.Not(logic.Or(deep, Q))
+print("5 --", syntax.parse(deep.formula()) is deep)
+print('\n')
+
+
+"""
+    KNOWLEDGE BASE
+"""
+print("----- KNOWLEDGE BASE -----")
+# 1 -- answers like logic.model_check on every puzzle and symbol ✅
+print("1 --", all(knowledge.KnowledgeBase(puzzle).ask_all(symbols)
+                  == [symbol for symbol in symbols
+                      if logic.model_check(puzzle, symbol)]
+                  for puzzle in puzzles))
+
+# 2 -- returns False, then True once told more after the first ask ✅
+kb = knowledge.KnowledgeBase(logic.Or(P, Q))
+print("2 --", kb.ask(P), end=" ")
+kb.tell(logic.Not(Q))
+print(kb.ask(P))
+
+# 3 -- agrees with logic.model_check telling and asking random sentences ✅
+agree = True
+for _ in range(100):
+    kb = knowledge.KnowledgeBase()
+    told = []
+    for _ in range(3):
+        sentence = random_sentence(3)
+        kb.tell(sentence)
+        told.append(sentence)
+        query = random_sentence(2)
+        agree = agree and (kb.ask(query)
+                           == logic.model_check(logic.And(*told), query))
+print("3 --", agree)
+
+# 4 -- returns True, True, False, True from the SAT solver past TABLE_SYMBOLS ✅
+chain = [logic.Symbol(f"s{i}") for i in range(knowledge.TABLE_SYMBOLS + 6)]
+kb = knowledge.KnowledgeBase(chain[0], *[logic.Implication(a, b)
+                                        for a, b in zip(chain, chain[1:])])
+print("4 --", kb.models is None, kb.ask(chain[-1]),
+      kb.ask(logic.Not(chain[-1])), kb.satisfiable())
+
+# 5 -- returns False, True once told a contradiction past TABLE_SYMBOLS ✅
+kb.tell(logic.Not(chain[-1]))
+print("5 --", kb.satisfiable(), kb.ask(logic.Not(chain[0])))
+print('\n')
+
+
+"""
+    PRUNING
+"""
+print("----- PRUNING -----")
+# 1 -- agrees with prune=False on every puzzle and symbol ✅
+print("1 --", all(logic.model_check(puzzle, symbol, prune=True)
+                  == logic.model_check(puzzle, symbol, prune=False)
+                  for puzzle in puzzles for symbol in symbols))
+
+# 2 -- agrees with prune=False on 300 random sentences ✅
+pairs = [(random_sentence(4), random_sentence(3)) for _ in range(300)]
+print("2 --", all(logic.model_check(knowledge, query, prune=True)
+                  == logic.model_check(knowledge, query, prune=False)
+                  for knowledge, query in pairs))
+
+# 3 -- agrees with prune=False given part of the model ✅
+print("3 --", all(logic.model_check(knowledge, query, model={"P": True})
+                  == logic.model_check(knowledge, query, prune=False,
+                                       model={"P": True})
+                  for knowledge, query in pairs))
+
+# 4 -- returns 64 64: every model checked for an entailed query without pruning ✅
+logic.model_check(knowledge3, AKnight, prune=False)
+print("4 --", logic.model_check_stats["models"],
+      logic.model_check_stats["space"])
+
+# 5 -- returns True: pruning reaches fewer complete models in the same space ✅
+logic.model_check(knowledge3, AKnight)
+print("5 --", logic.model_check_stats["models"] < 64
+      and logic.model_check_stats["space"] == 64)
+print('\n')
+
+
+"""
+    PARALLEL
+"""
+print("----- PARALLEL -----")
+# 1 -- agrees with logic.model_check on every puzzle and symbol ✅
+print("1 --", all(parallel.model_check(puzzle, symbol, processes=2)
+                  == logic.model_check(puzzle, symbol)
+                  for puzzle in puzzles for symbol in symbols))
+
+# 2 -- agrees with logic.model_check on 40 random sentences, unpruned ✅
+print("2 --", all(parallel.model_check(knowledge, query, processes=2,
+                                       prune=False)
+                  == logic.model_check(knowledge, query)
+                  for knowledge, query in pairs[:40]))
+
+# 3 -- returns True, False over 16 symbols split into 16 tasks ✅
+print("3 --", parallel.model_check(logic.And(*chain[:16]), chain[15],
+                                   processes=2, k=4),
+      parallel.model_check(logic.Implication(chain[0], chain[1]), chain[1],
+                           processes=2, k=1))
+
+# 4 -- returns the same in this process with processes=1 ✅
+print("4 --", parallel.model_check(knowledge3, AKnight, processes=1),
+      parallel.model_check(knowledge3, AKnave, processes=1))
+print('\n')
@@ -1,5 +1,6 @@
 import itertools
 import random
+from collections import deque
 
 
 class Minesweeper():
@@ -89,17 +90,31 @@ class Sentence():
     Logical statement about a Minesweeper game
     A sentence consists of a set of board cells,
     and a count of the number of those cells which are mines.
+
+    Sentences hash on their cells and count, so the AI never changes one
+    in place once it is in a set or index: `mark_mine` and `mark_safe`
+    return an updated copy instead.
     """
 
+    __slots__ = ("cells", "count", "_hash")
+
     def __init__(self, cells, count):
-        self.cells = set(cells)
+        self.cells = frozenset(cells)
         self.count = count
+        self._hash = None
 
     def __eq__(self, other):
+        if not isinstance(other, Sentence):
+            return NotImplemented
         return self.cells == other.cells and self.count == other.count
 
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash((self.cells, self.count))
+        return self._hash
+
     def __str__(self):
-        return f"{self.cells} = {self.count}"
+        return f"{set(self.cells)} = {self.count}"
 
     def known_mines(self):
         """
@@ -123,22 +138,23 @@ class Sentence():
 
     def mark_mine(self, cell):
         """
-        Updates internal knowledge representation given the fact that
-        a cell is known to be a mine.
+        Returns the sentence left once a cell is known to be a mine,
+        without changing this one.
         """
         # Remove the cell from the set and decrease the count by 1
-        if (cell in self.cells):
-            self.cells.remove(cell)
-            self.count -= 1
+        if cell not in self.cells:
+            return self
+        return Sentence(self.cells - {cell}, self.count - 1)
 
     def mark_safe(self, cell):
         """
-        Updates internal knowledge representation given the fact that
-        a cell is known to be safe.
+        Returns the sentence left once a cell is known to be safe,
+        without changing this one.
         """
         # Just remove the cell from the set
-        if (cell in self.cells):
-            self.cells.remove(cell)
+        if cell not in self.cells:
+            return self
+        return Sentence(self.cells - {cell}, self.count)
 
 
 class MinesweeperAI():
@@ -159,8 +175,15 @@ class MinesweeperAI():
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Set of sentences about the game known to be true, none of them
+        # empty or holding a cell known to be safe or a mine
+        self.knowledge = set()
+
+        # Maps each cell to the sentences in the knowledge that hold it
+        self.sentences_by_cell = {}
+
+        # Sentences added or changed since they were last examined
+        self.pending = deque()
 
     def mark_mine(self, cell):
         """
@@ -168,8 +191,11 @@ class MinesweeperAI():
         to mark that cell as a mine as well.
         """
         self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+
+        # Only the sentences holding the cell change
+        for sentence in list(self.sentences_by_cell.get(cell, ())):
+            self.remove_sentence(sentence)
+            self.add_sentence(sentence.mark_mine(cell))
 
     def mark_safe(self, cell):
         """
@@ -177,8 +203,34 @@ class MinesweeperAI():
         to mark that cell as safe as well.
         """
         self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+
+        # Only the sentences holding the cell change
+        for sentence in list(self.sentences_by_cell.get(cell, ())):
+            self.remove_sentence(sentence)
+            self.add_sentence(sentence.mark_safe(cell))
+
+    def add_sentence(self, sentence):
+        """
+        Adds a sentence to the knowledge, unless it is empty or already
+        known, and queues it to be examined.
+        """
+        if not sentence.cells or sentence in self.knowledge:
+            return
+        self.knowledge.add(sentence)
+        for cell in sentence.cells:
+            self.sentences_by_cell.setdefault(cell, set()).add(sentence)
+        self.pending.append(sentence)
+
+    def remove_sentence(self, sentence):
+        """
+        Removes a sentence from the knowledge.
+        """
+        self.knowledge.discard(sentence)
+        for cell in sentence.cells:
+            sentences = self.sentences_by_cell[cell]
+            sentences.discard(sentence)
+            if not sentences:
+                del self.sentences_by_cell[cell]
 
     def add_knowledge(self, cell, count):
         """
@@ -199,7 +251,7 @@ class MinesweeperAI():
         self.moves_made.add(cell)
 
         # Mark the cell as safe
-        self.safes.add(cell)
+        self.mark_safe(cell)
 
         # add a new sentence to the AI's knowledge base
         # get the set of all the neigbord whose state is unknown
@@ -211,7 +263,7 @@ class MinesweeperAI():
                 l = cell[1] + j
 
                 # If the cell falls outside the board, continue
-                if (k < 0) or (k > self.width - 1) or (l < 0) or (l > self.height - 1):
+                if (k < 0) or (k > self.height - 1) or (l < 0) or (l > self.width - 1):
                     continue
 
                 # If the cell is safe, continue
@@ -227,38 +279,53 @@ class MinesweeperAI():
                 neighbors.add((k, l))
 
         # add sentence to knowledge
-        self.knowledge.append(Sentence(neighbors, count))
+        self.add_sentence(Sentence(neighbors, count))
 
-        # mark cells as safe or mines for each knowledge
-        for sentence in self.knowledge:
-            known_mines = sentence.known_mines()
-            known_safes = sentence.known_safes()
+        # Draw conclusions from the new sentence, and from each
+        # sentence they change in turn
+        self.propagate()
+
+    def propagate(self):
+        """
+        Examines pending sentences until there are none left: marks the
+        cells of a sentence as mines or safe if it is known which they
+        are, and otherwise infers the difference between the sentence and
+        each sentence holding a subset or superset of its cells.
+
+        Only sentences sharing a cell with a changed sentence are looked
+        at, so the work depends on how much a move changes, not on how
+        much is known.
+        """
+        while self.pending:
+            sentence = self.pending.popleft()
+
+            # Skip sentences changed since they were queued
+            if sentence not in self.knowledge:
+                continue
 
-            if known_mines: 
+            known_mines = sentence.known_mines()
+            if known_mines:
                 for mine in known_mines.copy():
                     self.mark_mine(mine)
+                continue
+            known_safes = sentence.known_safes()
             if known_safes:
                 for safe in known_safes.copy():
                     self.mark_safe(safe)
-
-        # Apply the subset knowledge to every pair of sentences in the knowledge
-        for sentenceA in self.knowledge:
-            for sentenceB in self.knowledge:
-                if sentenceA.cells.issubset(sentenceB.cells):
-                    new_cells = sentenceB.cells - sentenceA.cells
-                    new_count = sentenceB.count - sentenceA.count
-                    new_sentence = Sentence(new_cells, new_count)
-                    if new_sentence not in self.knowledge:
-                        self.knowledge.append(new_sentence)
-
-                if sentenceB.cells.issubset(sentenceA.cells):
-                    new_cells = sentenceA.cells - sentenceB.cells
-                    new_count = sentenceA.count - sentenceB.count
-                    new_sentence = Sentence(new_cells, new_count)
-                    if new_sentence not in self.knowledge:
-                        self.knowledge.append(new_sentence)
-
-
+                continue
+
+            # Apply the subset knowledge to sentences sharing a cell
+            related = set()
+            for cell in sentence.cells:
+                related.update(self.sentences_by_cell[cell])
+            related.discard(sentence)
+            for other in related:
+                if sentence.cells < other.cells:
+                    self.add_sentence(Sentence(other.cells - sentence.cells,
+                                               other.count - sentence.count))
+                elif other.cells < sentence.cells:
+                    self.add_sentence(Sentence(sentence.cells - other.cells,
+                                               sentence.count - other.count))
 
     def make_safe_move(self):
         """